@@ -4,26 +4,199 @@ ASR Module - Automatic Speech Recognition for Hindi
 Uses Vosk for offline speech-to-text conversion
 
 This module handles:
-- Audio input from microphone
+- Audio input from microphone, recorded files or pipes
 - Real-time speech recognition
 - Converting Hindi speech to text
 """
 
 import json
-import pyaudio
+import threading
+import time
 from vosk import Model, KaldiRecognizer
 
+from audio_source import PyAudioSource, WavFileSource, open_source
+from audio_capture import BufferedSource
+from audio_processing import BargeInDetector, LevelMeter, Preprocessor, VoiceActivityGate
+from model_server import DEFAULT_SOCKET, RemoteModel
+
+class RecognizerManager:
+    """
+    Keeps KaldiRecognizer instances alive between utterances
+    
+    Building a recognizer allocates the decoder graph state, which costs
+    time exactly when the next command starts. Instead the recognizer
+    is reset in place, or - with keep_spare - swapped for a spare that
+    was already reset on a background thread.
+    
+    With a grammar set, the recognizers only decode the given phrases and
+    a separate open-vocabulary recognizer is kept for fallback decoding.
+    """
+    
+    def __init__(self, model, sample_rate, keep_spare=False, grammar=None):
+        """
+        Args:
+            model (Model or RemoteModel): Loaded Vosk model
+            sample_rate (int): Sample rate of the audio
+            keep_spare (bool): Keep a pre-warmed second recognizer ready
+            grammar (list): Phrases to restrict decoding to, or None
+        """
+        self.model = model
+        self.sample_rate = sample_rate
+        self.keep_spare = keep_spare
+        self.grammar = grammar
+        self._open_recognizer = None
+        
+        # Statistics
+        self.built = 0
+        self.resets = 0
+        self.swaps = 0
+        
+        self.current = self._build()
+        self.spare = None
+        self._spare_ready = threading.Event()
+        
+        if keep_spare:
+            self._prepare_spare(self._build())
+    
+    def _build(self):
+        """Create a new recognizer"""
+        self.built += 1
+        return self._new_recognizer(self.grammar)
+    
+    def _new_recognizer(self, grammar=None):
+        """KaldiRecognizer, in this process or in the model server"""
+        if isinstance(self.model, RemoteModel):
+            return self.model.recognizer(self.sample_rate, grammar)
+        if grammar is not None:
+            grammar_json = json.dumps(grammar, ensure_ascii=False)
+            return KaldiRecognizer(self.model, self.sample_rate, grammar_json)
+        return KaldiRecognizer(self.model, self.sample_rate)
+    
+    def set_grammar(self, grammar):
+        """
+        Switch to a new phrase list (None for open vocabulary)
+        
+        Rebuilds the current and spare recognizers, so call it between
+        utterances, not in the middle of one.
+        
+        Args:
+            grammar (list): Phrases to restrict decoding to, or None
+        """
+        if self.keep_spare:
+            # Don't let a background reset race with the rebuild
+            self._spare_ready.wait(timeout=1.0)
+        
+        replaced = (self.current, self.spare)
+        self.grammar = grammar
+        self.current = self._build()
+        
+        if self.keep_spare:
+            self._spare_ready.clear()
+            self._prepare_spare(self._build())
+        
+        self._close_all(replaced)
+    
+    def open_vocabulary(self):
+        """
+        Get a clean full-vocabulary recognizer for fallback decoding
+        
+        Returns:
+            KaldiRecognizer: The current recognizer when no grammar is set,
+                             otherwise a dedicated reusable recognizer
+        """
+        if self.grammar is None:
+            return self.current
+        
+        if self._open_recognizer is None:
+            self.built += 1
+            self._open_recognizer = self._new_recognizer()
+        else:
+            self._open_recognizer.Reset()
+        return self._open_recognizer
+    
+    def _prepare_spare(self, recognizer):
+        """Reset a recognizer and park it as the spare"""
+        recognizer.Reset()
+        self.spare = recognizer
+        self._spare_ready.set()
+    
+    def next_utterance(self):
+        """
+        Get a recognizer ready for a new utterance
+        
+        Returns:
+            KaldiRecognizer: Clean recognizer (also stored as current)
+        """
+        if self.keep_spare and self._spare_ready.is_set():
+            self._spare_ready.clear()
+            used, self.current, self.spare = self.current, self.spare, None
+            self.swaps += 1
+            
+            # Clean the used one off the critical path
+            threading.Thread(target=self._prepare_spare, args=(used,),
+                             daemon=True).start()
+        else:
+            self.current.Reset()
+            self.resets += 1
+        
+        return self.current
+    
+    def close(self):
+        """Close the recognizers (only model server connections hold resources)"""
+        if self.keep_spare:
+            # Let a background reset finish first
+            self._spare_ready.wait(timeout=1.0)
+        self._close_all((self.current, self.spare, self._open_recognizer))
+        self.current = self.spare = self._open_recognizer = None
+    
+    @staticmethod
+    def _close_all(recognizers):
+        for recognizer in recognizers:
+            if recognizer is not None and hasattr(recognizer, 'close'):
+                recognizer.close()
+    
+    def stats(self):
+        """
+        Lifecycle statistics
+        
+        Returns:
+            dict: Recognizers built, in-place resets and spare swaps
+        """
+        return {
+            'built': self.built,
+            'resets': self.resets,
+            'swaps': self.swaps,
+        }
+
+
 class SpeechRecognizer:
     """
     Handles speech-to-text conversion using Vosk
     """
     
-    def __init__(self, model_path="/home/pi/vosk-model-hindi"):
+    def __init__(self, model_path="/home/pi/vosk-model-hindi", source=None,
+                 buffered=None, vad=None, spare_recognizer=False,
+                 model_server=None, preprocess=None):
         """
         Initialize the speech recognizer
         
         Args:
             model_path (str): Path to Vosk Hindi model
+            source (AudioSource): Where audio comes from. Defaults to the
+                                  microphone (PyAudioSource).
+            buffered (bool): Capture on a background thread into a ring
+                             buffer. Defaults to True for live sources.
+            vad (bool or VoiceActivityGate): Skip silence before it reaches
+                             Vosk. Defaults to True for live sources.
+            spare_recognizer (bool): Keep a pre-warmed recognizer ready
+                             for back-to-back commands
+            model_server (str): Socket (or host:port) of a running
+                             model_server.py to use instead of loading the
+                             model here (falls back to loading it if no
+                             server answers)
+            preprocess (bool or Preprocessor): DC removal, high-pass and
+                             AGC before the gate. Defaults to True for
+                             live sources.
         """
         print("🎤 Initializing Speech Recognizer...")
         
@@ -32,64 +205,322 @@ class SpeechRecognizer:
         self.sample_rate = 16000  # 16kHz is standard for speech
         self.chunk_size = 8192    # Audio buffer size
         
-        # Load Vosk model
+        # Open the audio source first so file sources can set the sample rate
+        if source is None:
+            source = PyAudioSource(sample_rate=self.sample_rate,
+                                   chunk_size=self.chunk_size)
+        if buffered is None:
+            buffered = source.is_live
+        if buffered and not isinstance(source, BufferedSource):
+            source = BufferedSource(source)
+        self.source = source
+        self.sample_rate = source.sample_rate
+        
+        # Input level of every captured block (monitoring, AGC)
+        self.level_meter = LevelMeter()
+        if isinstance(source, BufferedSource):
+            source.add_listener(self.level_meter.process)
+        
+        # Clean-up and gain control in front of the gate
+        if preprocess is None:
+            preprocess = source.is_live
+        if preprocess is True:
+            preprocess = Preprocessor(sample_rate=self.sample_rate)
+        self.preprocessor = preprocess or None
+        
+        # Voice activity gate in front of the recognizer
+        if vad is None:
+            vad = source.is_live
+        if vad is True:
+            vad = VoiceActivityGate(sample_rate=self.sample_rate)
+        self.vad = vad or None
+        
+        # Load Vosk model (or attach to the resident model server)
         try:
-            print(f"   Loading model from: {model_path}")
-            self.model = Model(model_path)
-            self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
+            self.model = None
+            if model_server:
+                try:
+                    self.model = RemoteModel(model_server)
+                    print(f"   Using model server: {model_server}")
+                except OSError as e:
+                    print(f"   ⚠️  Model server unavailable ({e}), loading locally")
+            
+            if self.model is None:
+                print(f"   Loading model from: {model_path}")
+                self.model = Model(model_path)
+            
+            self.recognizers = RecognizerManager(self.model, self.sample_rate,
+                                                 keep_spare=spare_recognizer)
+            self.recognizer = self.recognizers.current
             print("   ✅ Model loaded successfully!")
+            
+            # Grammar-restricted decoding (see enable_command_mode)
+            self.command_mode = False
+            self.command_stats = {'grammar_hits': 0, 'fallbacks': 0}
+            self._utterance_audio = []
+            
+            # Early dispatch state (see listen)
+            self.last_early_dispatch = None
+            self._discard_segment = False
+            
+            # Set once a file or pipe source has no more audio
+            self.source_exhausted = False
+            self.bytes_read = 0  # Audio taken from the source so far
+            
+            # Barge-in (see enable_barge_in)
+            self.output = None
+            self.barge_in = None
+            self.barge_ins = 0
+            self.barge_in_preroll = 0.3  # Seconds of the user's words before detection
+            self._barge_in_at = None
         except Exception as e:
             print(f"   ❌ Error loading model: {e}")
+            self.source.close()
             raise
         
-        # Initialize PyAudio
-        self.audio = pyaudio.PyAudio()
+        print("   ✅ Audio source initialized!")
+        print(f"   Using: {self.source.describe()}")
+    
+    def _read_chunk(self, num_frames=4096, trace=None, deadline=None):
+        """
+        Read the next chunk that should reach the recognizer
         
-        # Find microphone
-        self.mic_index = self._find_microphone()
+        Audio is cleaned up by the preprocessor (if any), then silence
+        rejected by the voice activity gate is skipped here, so the
+        recognizer only ever sees speech (plus pre-roll/hangover).
+        After an early dispatch the rest of that speech segment is
+        skipped as well (up to the recognizer's endpoint when there is
+        no gate), so its tail is not heard as a new command.
         
-        # Open audio stream
-        self.stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.sample_rate,
-            input=True,
-            input_device_index=self.mic_index,
-            frames_per_buffer=self.chunk_size
-        )
+        Args:
+            num_frames (int): Frames to read from the source per chunk
+            trace (Trace): Accumulates capture, preprocessing and VAD time
+            deadline (float): time.monotonic() value after which skipping
+                              silence gives up
         
-        print("   ✅ Microphone initialized!")
-        print(f"   Using device: {self.mic_index}")
+        Returns:
+            tuple: (audio bytes, True if a speech segment just ended),
+                   (b'', False) when the deadline passed in silence,
+                   or (None, False) when the source is exhausted
+        """
+        while True:
+            if trace is not None:
+                start = time.perf_counter_ns()
+            
+            data = self.source.read(num_frames)
+            if not data:
+                self.source_exhausted = True
+                return None, False
+            self.bytes_read += len(data)
+            
+            if trace is not None:
+                now = time.perf_counter_ns()
+                trace.add('capture', now - start)
+                start = now
+            
+            if self.preprocessor is not None:
+                if self.vad is not None:
+                    # Let the AGC learn the level of speech, not of the room
+                    self.preprocessor.adapt = self.vad.active
+                data = self.preprocessor.process(data)
+                if trace is not None:
+                    now = time.perf_counter_ns()
+                    trace.add('preprocess', now - start)
+                    start = now
+            
+            if self.vad is None:
+                if self._discard_segment:
+                    # No gate to tell where the dispatched speech ends -
+                    # let the recognizer find its endpoint, then start clean
+                    if self.recognizer.AcceptWaveform(data):
+                        self._discard_segment = False
+                        self._start_utterance()
+                    if deadline is not None and time.monotonic() > deadline:
+                        return b'', False
+                    continue
+                return data, False
+            
+            # The gate decides on the level before gain control, or the
+            # AGC would lift room noise over its threshold
+            analysis = self.preprocessor.unboosted if self.preprocessor is not None else None
+            voiced = self.vad.process(data, analysis)
+            
+            if trace is not None:
+                trace.add('vad', time.perf_counter_ns() - start)
+            
+            if self._discard_segment:
+                if voiced and not self.vad.segment_ended:
+                    continue
+                self._discard_segment = False
+                if voiced:
+                    continue
+            
+            if voiced:
+                return voiced, self.vad.segment_ended
+            
+            if deadline is not None and time.monotonic() > deadline:
+                return b'', False
+    
+    def _final_text(self):
+        """Flush the recognizer and return the text of the utterance"""
+        return self._utterance_text(self.recognizer.FinalResult())
     
-    def _find_microphone(self):
+    def _start_utterance(self):
+        """Get a clean recognizer and forget the previous utterance's audio"""
+        self.recognizer = self.recognizers.next_utterance()
+        self._utterance_audio = []
+    
+    def _accept(self, data):
         """
-        Find the USB microphone device
+        Feed audio to the recognizer
+        
+        In command mode the audio is also kept, so the utterance can be
+        decoded again with the full vocabulary if the grammar rejects it.
         
         Returns:
-            int: Device index of the microphone
+            bool: True when Vosk detected the end of an utterance
+        """
+        if self.command_mode:
+            self._utterance_audio.append(data)
+        return self.recognizer.AcceptWaveform(data)
+    
+    def _utterance_text(self, result_json):
+        """
+        Extract the text from a Vosk result
+        
+        In command mode the [unk] filler is removed. If nothing but [unk]
+        was heard, the utterance was out of domain and is decoded again
+        with the open vocabulary.
         """
-        info = self.audio.get_host_api_info_by_index(0)
-        num_devices = info.get('deviceCount')
+        text = json.loads(result_json).get('text', '').strip()
+        
+        if not self.command_mode:
+            return text
         
-        print(f"   Found {num_devices} audio devices")
+        words = [word for word in text.split() if word != '[unk]']
+        audio, self._utterance_audio = self._utterance_audio, []
         
-        # List all input devices
-        for i in range(num_devices):
-            device_info = self.audio.get_device_info_by_host_api_device_index(0, i)
-            if device_info.get('maxInputChannels') > 0:
-                print(f"   Device {i}: {device_info.get('name')}")
+        if words or not text:
+            if words:
+                self.command_stats['grammar_hits'] += 1
+            return ' '.join(words)
         
-        # For now, use default input device
-        # You can modify this to select specific device
-        default_device = self.audio.get_default_input_device_info()
-        return default_device['index']
+        # Out of domain - try again without the grammar
+        self.command_stats['fallbacks'] += 1
+        recognizer = self.recognizers.open_vocabulary()
+        recognizer.AcceptWaveform(b''.join(audio))
+        return json.loads(recognizer.FinalResult()).get('text', '').strip()
     
-    def listen(self, timeout=5):
+    def enable_command_mode(self, phrases):
+        """
+        Restrict decoding to the given command phrases
+        
+        Decoding against a small phrase list is faster and cannot produce
+        words that no intent understands. Anything else is decoded as
+        [unk] and then retried with the full vocabulary.
+        
+        Args:
+            phrases (list): Command phrases, e.g. from
+                            IntentHandler.get_grammar_phrases()
+        """
+        grammar = sorted(set(phrases)) + ['[unk]']
+        self.recognizers.set_grammar(grammar)
+        self.recognizer = self.recognizers.current
+        self.command_mode = True
+        
+        print(f"   ✅ Command mode: {len(grammar) - 1} phrases")
+    
+    def disable_command_mode(self):
+        """Go back to open-vocabulary decoding"""
+        self.recognizers.set_grammar(None)
+        self.recognizer = self.recognizers.current
+        self.command_mode = False
+    
+    def enable_wake_word(self, phrases):
+        """
+        Set up keyword spotting for wait_for_wake_word()
+        
+        A second recognizer decodes against just the wake phrases (plus
+        [unk]). Its search is far cheaper than open-vocabulary decoding,
+        so the assistant can stay in this idle mode most of the time.
+        The phrases must use words of the model's vocabulary.
+        
+        Args:
+            phrases (list): Wake phrases, e.g. ['सहायक']
+        """
+        self.wake_phrases = [' '.join(p.split()) for p in phrases]
+        self.wake_recognizers = RecognizerManager(
+            self.model, self.sample_rate, grammar=sorted(set(self.wake_phrases)) + ['[unk]'])
+        self.wake_stats = {'detections': 0, 'segments': 0}
+        
+        print(f"   ✅ Wake word: {' / '.join(self.wake_phrases)}")
+    
+    def _is_wake_phrase(self, text):
+        """True if the decoded text contains a wake phrase"""
+        text = ' '.join(w for w in text.split() if w != '[unk]')
+        return any(phrase in text for phrase in self.wake_phrases)
+    
+    def wait_for_wake_word(self, timeout=None):
+        """
+        Idle mode: listen only for the wake phrase
+        
+        Silence is skipped by the gate as usual and speech is decoded in
+        larger chunks against the wake grammar only. Detection happens on
+        partial results, so a command spoken right after the wake phrase
+        is picked up by the next listen().
+        
+        Args:
+            timeout (float): Give up after this many seconds (None = never)
+            
+        Returns:
+            bool: True when the wake phrase was heard
+        """
+        recognizer = self.wake_recognizers.next_utterance()
+        deadline = time.monotonic() + timeout if timeout else None
+        
+        while True:
+            data, segment_ended = self._read_chunk(3200, deadline=deadline)
+            if not data:
+                return False  # Source exhausted or timed out
+            
+            if recognizer.AcceptWaveform(data):
+                text = json.loads(recognizer.Result()).get('text', '')
+            else:
+                text = json.loads(recognizer.PartialResult()).get('partial', '')
+            
+            if text and self._is_wake_phrase(text):
+                self.wake_stats['detections'] += 1
+                return True
+            
+            if segment_ended:
+                # Speech without the wake phrase - start over on the next one
+                self.wake_stats['segments'] += 1
+                if self._is_wake_phrase(json.loads(recognizer.FinalResult()).get('text', '')):
+                    self.wake_stats['detections'] += 1
+                    return True
+                recognizer = self.wake_recognizers.next_utterance()
+            
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+    
+    def listen(self, timeout=None, early_intent=None, stable_partials=3, trace=None):
         """
         Listen for speech and convert to text
         
+        With early_intent, every partial result is matched against the
+        intents while the user is still speaking. Once a single intent
+        has matched for stable_partials partials in a row and the partial
+        text has stopped changing, the partial text is returned without
+        waiting for Vosk's end-of-utterance silence.
+        
         Args:
-            timeout (int): Maximum seconds to listen
+            timeout (float): Maximum seconds to wait for speech to start
+                             (None to wait until something is said)
+            early_intent (function): Maps partial text to an intent name,
+                                     or None when unsure - for example
+                                     IntentHandler.match_early
+            stable_partials (int): Partials the intent must stay stable for
+            trace (Trace): Records capture/VAD time, first partial and endpoint
             
         Returns:
             str: Recognized text in Hindi, or None if no speech
@@ -98,40 +529,114 @@ class SpeechRecognizer:
         print("🎧 Listening...", end=" ", flush=True)
         
         # Clear any previous recognition
-        self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        self._start_utterance()
+        self.last_early_dispatch = None
         
         recognized_text = None
-        start_time = 0
+        deadline = time.monotonic() + timeout if timeout else None
         speech_started = False
+        heard = False  # Speech reached the recognizer - the timeout no longer applies
+        
+        # Smaller reads give more frequent partials for early dispatch
+        num_frames = 1600 if early_intent else 4096
+        early_candidate = None
+        early_count = 0
+        previous_partial = None
         
         try:
             while True:
-                # Read audio data
-                data = self.stream.read(4096, exception_on_overflow=False)
+                if self._barge_in_at is not None:
+                    # Interrupted the assistant - drop the echo and start over
+                    self._drop_echo()
+                    speech_started = heard = False
+                    early_candidate, early_count, previous_partial = None, 0, None
+                    deadline = time.monotonic() + timeout if timeout else None
+                    continue
+                
+                # Read audio data (silence is skipped by the VAD gate)
+                data, segment_ended = self._read_chunk(
+                    num_frames, trace, None if heard else deadline)
+                
+                if data is None:
+                    # Source exhausted - flush whatever was said last
+                    recognized_text = self._final_text() or None
+                    break
+                
+                if self._barge_in_at is not None:
+                    continue  # Read before the barge-in: our own voice
+                
+                if data and self.vad is not None:
+                    heard = True  # Only voiced audio passes the gate
+                
+                if not heard and deadline is not None and time.monotonic() > deadline:
+                    # Nothing said in time
+                    recognized_text = self._final_text() or None
+                    break
                 
                 # Process audio
-                if self.recognizer.AcceptWaveform(data):
+                if self._accept(data):
                     # Speech segment completed
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get('text', '').strip()
+                    text = self._utterance_text(self.recognizer.Result())
                     
                     if text:
                         recognized_text = text
                         break
+                    segment_ended = True  # Nothing in it - start over below
                 else:
                     # Partial result (ongoing speech)
                     partial = json.loads(self.recognizer.PartialResult())
                     partial_text = partial.get('partial', '')
                     
                     if partial_text and not speech_started:
-                        speech_started = True
+                        speech_started = heard = True
+                        if trace is not None:
+                            trace.mark('first_partial')
                         print("👂 Detecting speech...", end=" ", flush=True)
+                    
+                    if early_intent and partial_text:
+                        words = [w for w in partial_text.split() if w != '[unk]']
+                        partial_text = ' '.join(words)
+                        intent = early_intent(partial_text)
+                        
+                        if intent is not None and intent == early_candidate:
+                            early_count += 1
+                        else:
+                            early_candidate = intent
+                            early_count = 1 if intent else 0
+                        
+                        if (early_count >= stable_partials
+                                and partial_text == previous_partial):
+                            # Confident enough - don't wait for the endpoint
+                            recognized_text = partial_text
+                            self.last_early_dispatch = early_candidate
+                            self._discard_segment = not segment_ended
+                            self._utterance_audio = []
+                            print("⚡ Early dispatch!", end=" ", flush=True)
+                            break
+                        
+                        previous_partial = partial_text
+                
+                if segment_ended:
+                    # The gate closed on silence - no need to wait for
+                    # Vosk's own endpoint detection
+                    text = self._final_text()
+                    if text:
+                        recognized_text = text
+                        break
+                    
+                    # Only noise (a cough, a door) - wait for speech again,
+                    # and the timeout applies again
+                    self._start_utterance()
+                    speech_started = heard = False
+                    early_candidate, early_count, previous_partial = None, 0, None
         
         except KeyboardInterrupt:
             print("\n⚠️  Listening interrupted")
             return None
         
         if recognized_text:
+            if trace is not None:
+                trace.mark('endpoint')
             print(f"✅ Recognized!")
         else:
             print("❌ No speech detected")
@@ -152,18 +657,28 @@ class SpeechRecognizer:
         
         try:
             while True:
-                data = self.stream.read(4096, exception_on_overflow=False)
+                data, segment_ended = self._read_chunk()
                 
-                if self.recognizer.AcceptWaveform(data):
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get('text', '').strip()
-                    
+                if data is None:
+                    # Source exhausted - deliver the last utterance
+                    text = self._final_text()
                     if text:
-                        # Call the callback function with recognized text
                         callback(text)
-                        
-                        # Reset recognizer for next utterance
-                        self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
+                    break
+                
+                text = None
+                if self._accept(data):
+                    text = self._utterance_text(self.recognizer.Result())
+                
+                if not text and segment_ended:
+                    text = self._final_text()
+                
+                if text:
+                    # Call the callback function with recognized text
+                    callback(text)
+                    
+                    # Reset recognizer for next utterance
+                    self._start_utterance()
         
         except KeyboardInterrupt:
             print("\n⚠️  Continuous listening stopped")
@@ -179,41 +694,171 @@ class SpeechRecognizer:
         print(f"\n🎤 Testing microphone for {duration} seconds...")
         print("   Speak into the microphone!\n")
         
-        import struct
-        import math
+        meter = LevelMeter()
         
         for i in range(int(duration * self.sample_rate / self.chunk_size)):
-            data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            data = self.source.read(self.chunk_size)
+            if not data:
+                break
             
             # Calculate audio level
-            count = len(data) / 2
-            format_str = "%dh" % count
-            shorts = struct.unpack(format_str, data)
+            meter.process(data)
             
-            # RMS (Root Mean Square) of audio
-            sum_squares = sum(s**2 for s in shorts)
-            rms = math.sqrt(sum_squares / count)
+            # Visualize level (-60 dBFS .. 0 dBFS)
+            level = int((meter.rms_db + 60) * 50 / 60)
+            bar = "█" * max(0, min(level, 50))
+            clipping = " ⚠️ clipping" if meter.clipped else ""
+            print(f"   Level: {bar:50s} {meter.rms_db:6.1f} dBFS{clipping}", end="\r")
+        
+        levels = meter.stats()
+        print("\n✅ Microphone test complete!")
+        print(f"   Peak: {levels['max_peak_db']:.1f} dBFS, "
+              f"clipped: {levels['clipped_ratio']:.2%} of samples\n")
+    
+    def use_source(self, source):
+        """
+        Switch to another audio source, e.g. the next recording of a benchmark
+        
+        The model and recognizers are kept; the old source is closed.
+        
+        Args:
+            source (AudioSource): New source with the same sample rate
+        """
+        if source.sample_rate != self.sample_rate:
+            raise ValueError(f"Source is {source.sample_rate} Hz, "
+                             f"recognizer expects {self.sample_rate} Hz")
+        self.source.close()
+        self.source = source
+        self.source_exhausted = False
+        self._discard_segment = False
+        # Nothing of the previous recording may shape this one
+        if self.preprocessor is not None:
+            self.preprocessor.reset()
+        if self.vad is not None:
+            self.vad.reset()
+        self._start_utterance()
+    
+    def enable_barge_in(self, output, detector=None):
+        """
+        Stop the assistant's speech as soon as the user talks over it
+        
+        The check runs on the capture thread for every captured block,
+        so playback stops within one buffer period even while the main
+        thread is blocked in TextToSpeech.speak(). The user's words stay
+        in the ring buffer for the next listen().
+        
+        Args:
+            output (OutputEngine): Speaker output to interrupt
+            detector (BargeInDetector): Custom detector settings
+        """
+        if not isinstance(self.source, BufferedSource):
+            raise ValueError("Barge-in needs a buffered audio source")
+        
+        self.output = output
+        self.barge_in = detector or BargeInDetector(sample_rate=self.sample_rate)
+        output.reference_listeners.append(self.barge_in.add_reference)
+        self.source.add_listener(self._check_barge_in)
+        print("   ✅ Barge-in enabled")
+    
+    def _check_barge_in(self, data):
+        """Capture listener: interrupt playback when the user starts talking"""
+        if not self.output.playing:
+            self.barge_in.reset()
+            return
+        if self.barge_in.process(data):
+            self.output.stop()
+            self.barge_ins += 1
             
-            # Visualize level
-            level = int(rms / 1000)
-            bar = "█" * min(level, 50)
-            print(f"   Level: {bar} {rms:.0f}", end="\r")
+            # The user started a little before the detection; what was
+            # captured before that is our own voice (see _drop_echo)
+            preroll = int(self.barge_in_preroll * self.sample_rate) * self.source.sample_width
+            self._barge_in_at = max(0, self.source.position() - len(data) - preroll)
+    
+    def _drop_echo(self):
+        """
+        After a barge-in, forget our own voice - buffered or already fed
+        to the recognizer - so the user's words start a clean utterance
+        """
+        position, self._barge_in_at = self._barge_in_at, None
+        self.source.flush(before=position)
+        if self.vad is not None:
+            self.vad.reset()
+        self._discard_segment = False
+        self._start_utterance()
+    
+    def capture_stats(self):
+        """
+        Get audio capture statistics
+        
+        Returns:
+            dict: Overrun and buffer statistics, or None when the source
+                  is read directly (unbuffered)
+        """
+        if isinstance(self.source, BufferedSource):
+            return self.source.stats()
+        return None
+    
+    def level_stats(self):
+        """
+        Get the input level of the latest captured block
+        
+        Returns:
+            dict: RMS/peak levels and clipping, or None when the source
+                  is read directly (unbuffered)
+        """
+        if not isinstance(self.source, BufferedSource):
+            return None
+        return self.level_meter.stats()
+    
+    def preprocess_stats(self):
+        """
+        Get preprocessing statistics
+        
+        Returns:
+            dict: Current AGC gain and processing time per chunk, or None
+                  when preprocessing is disabled
+        """
+        if self.preprocessor is None:
+            return None
+        return self.preprocessor.stats()
+    
+    def vad_stats(self):
+        """
+        Get voice activity gate statistics
         
-        print("\n✅ Microphone test complete!\n")
+        Returns:
+            dict: Seconds of audio seen, passed and skipped, or None when
+                  the gate is disabled
+        """
+        if self.vad is None:
+            return None
+        return self.vad.stats()
     
     def close(self):
         """Clean up resources"""
         print("🛑 Closing speech recognizer...")
-        self.stream.stop_stream()
-        self.stream.close()
-        self.audio.terminate()
+        self.source.close()
+        self.recognizers.close()
+        if hasattr(self, 'wake_recognizers'):
+            self.wake_recognizers.close()
         print("   ✅ Closed successfully!")
 
 
-def test_asr():
+def test_asr(source_spec=None, model_path="/home/pi/vosk-model-hindi",
+             command_mode=False, model_server=None):
     """
     Test function to verify ASR is working
     Run this file directly to test: python3 asr_module.py
+    
+    Replay a recording instead of the microphone:
+        python3 asr_module.py recording.wav
+        arecord -f S16_LE -r 16000 -c 1 -t raw | python3 asr_module.py -
+    
+    Args:
+        source_spec (str): Audio source passed to open_source(), None for mic
+        model_path (str): Path to Vosk model
+        command_mode (bool): Decode with the grammar built from IntentHandler
+        model_server (str): Socket of a running model server, see model_server.py
     """
     
     print("\n" + "="*50)
@@ -221,10 +866,16 @@ def test_asr():
     print("="*50 + "\n")
     
     # Initialize recognizer
-    asr = SpeechRecognizer()
+    source = open_source(source_spec) if source_spec else None
+    asr = SpeechRecognizer(model_path, source=source, model_server=model_server)
+    
+    if command_mode:
+        from intent_handler import IntentHandler
+        asr.enable_command_mode(IntentHandler().get_grammar_phrases())
     
-    # Test 1: Microphone test
-    asr.test_microphone(duration=3)
+    # Test 1: Microphone test (only meaningful for live input)
+    if asr.source.is_live:
+        asr.test_microphone(duration=3)
     
     # Test 2: Single recognition
     print("📝 Test: Single recognition")
@@ -238,6 +889,20 @@ def test_asr():
             print(f"   Result {i+1}: (no speech)")
         print()
     
+    stats = asr.capture_stats()
+    if stats:
+        print(f"   Capture overruns: {stats['overruns']} "
+              f"({stats['dropped_seconds']:.2f} s dropped)")
+    
+    if asr.command_mode:
+        print(f"   Command mode: {asr.command_stats['grammar_hits']} grammar hits, "
+              f"{asr.command_stats['fallbacks']} open-vocabulary fallbacks")
+    
+    stats = asr.vad_stats()
+    if stats:
+        print(f"   Silence skipped: {stats['skipped_seconds']:.1f} s "
+              f"({stats['skipped_ratio']:.0%})")
+    
     # Clean up
     asr.close()
     
@@ -246,6 +911,182 @@ def test_asr():
     print("="*50 + "\n")
 
 
+def benchmark_recognizer_reuse(wav_path, model_path="/home/pi/vosk-model-hindi",
+                               rounds=10):
+    """
+    Compare time-to-first-partial for back-to-back commands when the
+    recognizer is rebuilt, reset in place, or swapped for a spare
+    
+    The recording is replayed as fast as possible, so the numbers are
+    pure compute time on this machine.
+    
+    Args:
+        wav_path (str): Recording of a short command
+        model_path (str): Path to Vosk model
+        rounds (int): Commands per strategy
+        
+    Returns:
+        dict: Median and mean time-to-first-partial (ms) per strategy
+    """
+    
+    print("\n" + "="*50)
+    print("Recognizer Reuse Benchmark")
+    print("="*50 + "\n")
+    
+    with WavFileSource(wav_path) as source:
+        sample_rate = source.sample_rate
+        chunks = []
+        while True:
+            data = source.read(1600)  # 100 ms at 16 kHz
+            if not data:
+                break
+            chunks.append(data)
+    
+    model = Model(model_path)
+    rebuild = {'recognizer': KaldiRecognizer(model, sample_rate)}
+    managers = {
+        'reset': RecognizerManager(model, sample_rate),
+        'spare': RecognizerManager(model, sample_rate, keep_spare=True),
+    }
+    
+    def next_recognizer(strategy):
+        if strategy == 'rebuild':
+            rebuild['recognizer'] = KaldiRecognizer(model, sample_rate)
+            return rebuild['recognizer']
+        return managers[strategy].next_utterance()
+    
+    results = {}
+    for strategy in ('rebuild', 'reset', 'spare'):
+        timings = []
+        
+        for i in range(rounds):
+            start = time.perf_counter()
+            recognizer = next_recognizer(strategy)
+            
+            first_partial = None
+            for data in chunks:
+                if recognizer.AcceptWaveform(data):
+                    first_partial = time.perf_counter()
+                    break
+                if json.loads(recognizer.PartialResult()).get('partial'):
+                    first_partial = time.perf_counter()
+                    break
+            
+            if first_partial is not None:
+                timings.append((first_partial - start) * 1000)
+            
+            # Finish the command like a real utterance would
+            recognizer.FinalResult()
+            
+            # Give the spare time to be reset, as the gap between commands would
+            time.sleep(0.05)
+        
+        if not timings:
+            print(f"   {strategy:8s} no partial result - is this a speech recording?")
+            continue
+        
+        timings.sort()
+        results[strategy] = {
+            'median_ms': timings[len(timings) // 2],
+            'mean_ms': sum(timings) / len(timings),
+        }
+        print(f"   {strategy:8s} median {results[strategy]['median_ms']:7.1f} ms   "
+              f"mean {results[strategy]['mean_ms']:7.1f} ms")
+    
+    print("\n" + "="*50 + "\n")
+    return results
+
+
+class _EmptyRecognizer:
+    """KaldiRecognizer stand-in that never recognizes any words"""
+    
+    def AcceptWaveform(self, data):
+        return False
+    
+    def Result(self):
+        return '{"text": ""}'
+    
+    def PartialResult(self):
+        return '{"partial": ""}'
+    
+    def FinalResult(self):
+        return '{"text": ""}'
+    
+    def Reset(self):
+        pass
+
+
+def test_listen_timeout(timeout=3.0):
+    """
+    Regression test: noise that decodes to nothing (a cough, a door)
+    must not switch off the listen() timeout, which the wake word
+    follow-up window relies on
+    
+    Needs no model or microphone: the recognizer is a stub returning
+    empty text, fed a 0.6 s noise burst and then silence in real time.
+    Run: python3 asr_module.py --test-timeout
+    """
+    import os
+    import tempfile
+    from unittest import mock
+    
+    import numpy as np
+    
+    print("\n📝 Test: listen() timeout after a noise burst")
+    
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    # Low-passed noise, so the gate takes it for speech
+    burst = np.convolve(rng.normal(0, 8000, int(0.6 * sample_rate)), np.ones(8) / 8, 'same')
+    pcm = np.concatenate((np.zeros(sample_rate // 2), burst, np.zeros(12 * sample_rate)))
+    
+    with tempfile.NamedTemporaryFile(suffix='.raw', delete=False) as f:
+        f.write(pcm.clip(-32768, 32767).astype('<i2').tobytes())
+    
+    try:
+        with mock.patch(f'{__name__}.Model'), \
+                mock.patch.object(RecognizerManager, '_new_recognizer',
+                                  lambda self, grammar=None: _EmptyRecognizer()):
+            asr = SpeechRecognizer(source=WavFileSource(f.name, realtime=True), vad=True)
+        
+        start = time.monotonic()
+        text = asr.listen(timeout=timeout)
+        elapsed = time.monotonic() - start
+        segments = asr.vad.segments
+        asr.close()
+    finally:
+        os.unlink(f.name)
+    
+    assert segments >= 1, "the noise burst did not pass the gate"
+    assert text is None, text
+    assert elapsed < timeout + 0.5, f"listen() returned after {elapsed:.1f} s"
+    print(f"   ✅ Returned after {elapsed:.1f} s (timeout {timeout:.1f} s)")
+
+
 if __name__ == "__main__":
     # Run test when this file is executed directly
-    test_asr()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Test the Hindi ASR module")
+    parser.add_argument('source', nargs='?', default=None,
+                        help="WAV file, '-' for stdin or a FIFO (default: microphone)")
+    parser.add_argument('--benchmark-reuse', action='store_true',
+                        help="benchmark recognizer reuse on the given WAV file")
+    parser.add_argument('--model', default="/home/pi/vosk-model-hindi",
+                        help="path to the Vosk model")
+    parser.add_argument('--command-mode', action='store_true',
+                        help="restrict decoding to the intent handler's phrases")
+    parser.add_argument('--model-server', nargs='?', const=DEFAULT_SOCKET, default=None,
+                        help="use the model loaded by model_server.py")
+    parser.add_argument('--test-timeout', action='store_true',
+                        help="check the listen() timeout (no model or microphone needed)")
+    args = parser.parse_args()
+    
+    if args.test_timeout:
+        test_listen_timeout()
+    elif args.benchmark_reuse:
+        if not args.source:
+            parser.error("--benchmark-reuse needs a WAV file")
+        benchmark_recognizer_reuse(args.source, args.model)
+    else:
+        test_asr(args.source, args.model, args.command_mode, args.model_server)
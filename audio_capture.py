@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Audio Capture Module - Background capture into a ring buffer
+Keeps reading the microphone while recognition or TTS is busy
+
+This module provides:
+- RingBuffer: preallocated single-producer / single-consumer byte ring
+- CaptureThread: reads an AudioSource on its own thread into the ring
+- BufferedSource: an AudioSource that consumes from the ring, so it can
+  be handed to SpeechRecognizer in place of the raw microphone
+"""
+
+import threading
+
+from audio_source import AudioSource
+
+
+class RingBuffer:
+    """
+    Fixed-size byte ring for one writer thread and one reader thread
+
+    The writer only advances write_pos and the reader only advances
+    read_pos, so no lock is needed around the data. Both positions
+    count bytes since creation and never wrap; the buffer offset is
+    the position modulo the capacity.
+
+    When the reader falls behind by more than the capacity, new blocks
+    are dropped (not written) and counted as overruns.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Size of the ring in bytes
+        """
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+
+        self.write_pos = 0
+        self.read_pos = 0
+
+        # Statistics
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.high_water = 0
+
+        # Wakes a reader waiting for data (not used to guard the data)
+        self._data_ready = threading.Event()
+
+    def available(self):
+        """Number of bytes waiting to be read"""
+        return self.write_pos - self.read_pos
+
+    def write(self, data):
+        """
+        Append a block (writer thread only)
+
+        Args:
+            data (bytes): Block to store
+
+        Returns:
+            bool: False if the block was dropped because the ring is full
+        """
+        size = len(data)
+        used = self.write_pos - self.read_pos
+
+        if size > self.capacity - used:
+            self.overruns += 1
+            self.dropped_bytes += size
+            return False
+
+        start = self.write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < size:
+            self._view[0:size - first] = data[first:]
+
+        self.write_pos += size
+
+        used += size
+        if used > self.high_water:
+            self.high_water = used
+
+        self._data_ready.set()
+        return True
+
+    def read(self, size):
+        """
+        Take up to size bytes (reader thread only)
+
+        Args:
+            size (int): Maximum number of bytes to return
+
+        Returns:
+            bytes: The oldest unread data, possibly shorter than size
+        """
+        size = min(size, self.write_pos - self.read_pos)
+        if size <= 0:
+            return b''
+
+        start = self.read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        if first == size:
+            data = bytes(self._view[start:start + size])
+        else:
+            data = bytes(self._view[start:]) + bytes(self._view[:size - first])
+
+        self.read_pos += size
+        return data
+
+    def wait(self, timeout=None):
+        """Block until the writer signals new data"""
+        self._data_ready.wait(timeout)
+        self._data_ready.clear()
+
+    def discard(self, upto=None):
+        """
+        Drop data waiting to be read (reader thread only)
+
+        Args:
+            upto (int): Drop only what was written before this position
+                        (default: everything)
+        """
+        target = self.write_pos if upto is None else min(upto, self.write_pos)
+        if target > self.read_pos:
+            self.read_pos = target
+
+    def notify(self):
+        """Wake up a waiting reader without writing (e.g. on end of stream)"""
+        self._data_ready.set()
+
+
+class CaptureThread(threading.Thread):
+    """
+    Reads an AudioSource continuously and stores the audio in a RingBuffer
+    """
+
+    def __init__(self, source, ring, block_frames=1024):
+        """
+        Args:
+            source (AudioSource): Audio to capture
+            ring (RingBuffer): Destination buffer
+            block_frames (int): Frames read from the source per block
+        """
+        super().__init__(name="audio-capture", daemon=True)
+        self.source = source
+        self.ring = ring
+        self.block_frames = block_frames
+
+        # Called with every captured block, on the capture thread
+        self.listeners = []
+
+        self.blocks_captured = 0
+        self.error = None
+        self.finished = False
+        self._stop_requested = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_requested.is_set():
+                data = self.source.read(self.block_frames)
+                if not data:
+                    break
+
+                self.ring.write(data)
+                self.blocks_captured += 1
+
+                for listener in self.listeners:
+                    listener(data)
+
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+            self.ring.notify()
+
+    def stop(self, timeout=1.0):
+        """Ask the thread to finish and wait for it"""
+        self._stop_requested.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+class BufferedSource(AudioSource):
+    """
+    AudioSource that captures another source on a background thread
+
+    Reads never touch the device directly, so slow decoding or a
+    blocking TTS call no longer cause the device buffer to overflow.
+    """
+
+    def __init__(self, source, buffer_seconds=10.0, block_frames=1024):
+        """
+        Start capturing immediately
+
+        Args:
+            source (AudioSource): Source to capture (usually a microphone)
+            buffer_seconds (float): Ring size in seconds of audio
+            block_frames (int): Frames per capture block
+        """
+        super().__init__(source.sample_rate)
+        self.source = source
+        self.is_live = source.is_live
+
+        bytes_per_second = source.sample_rate * source.sample_width
+        self.ring = RingBuffer(int(buffer_seconds * bytes_per_second))
+
+        self.capture = CaptureThread(source, self.ring, block_frames)
+        self.capture.start()
+
+    def read(self, num_frames):
+        wanted = num_frames * self.sample_width
+
+        while self.ring.available() < wanted:
+            if self.capture.finished:
+                if self.capture.error is not None:
+                    raise self.capture.error
+                break
+            self.ring.wait(timeout=0.5)
+
+        return self.ring.read(wanted)
+
+    def position(self):
+        """Bytes captured so far, to mark where something was heard"""
+        return self.ring.write_pos
+
+    def flush(self, before=None):
+        """
+        Throw away buffered audio, e.g. our own TTS output (reader thread only)
+
+        Args:
+            before (int): Only drop audio captured before this position()
+                          (default: everything captured so far)
+        """
+        self.ring.discard(before)
+
+    def add_listener(self, listener):
+        """
+        Register a function called with every captured block
+
+        Listeners run on the capture thread and must be quick.
+        """
+        self.capture.listeners.append(listener)
+
+    def stats(self):
+        """
+        Capture statistics
+
+        Returns:
+            dict: Blocks captured, overruns, dropped and buffered seconds
+        """
+        bytes_per_second = self.sample_rate * self.sample_width
+        return {
+            'blocks_captured': self.capture.blocks_captured,
+            'overruns': self.ring.overruns,
+            'dropped_seconds': self.ring.dropped_bytes / bytes_per_second,
+            'buffered_seconds': self.ring.available() / bytes_per_second,
+            'high_water_seconds': self.ring.high_water / bytes_per_second,
+        }
+
+    def close(self):
+        self.capture.stop()
+        self.source.close()
+
+    def describe(self):
+        return f"{self.source.describe()} (buffered)"
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Audio Output Module - In-process speaker output
+Plays PCM through a callback-driven PyAudio stream that stays open
+
+This module:
+- Queues PCM buffers and feeds them to the sound card from the
+  stream callback, one buffer period at a time
+- Can stop playback (barge-in) or duck its volume at any moment;
+  a stop takes effect at the next buffer period
+- Hands every block it plays to reference listeners, so the capture
+  side knows what the speaker is currently emitting
+"""
+
+from collections import deque
+import threading
+
+import numpy as np
+
+
+class OutputEngine:
+    """
+    Speaker output with stop and duck controls
+    """
+
+    def __init__(self, sample_rate=22050, frames_per_buffer=1024, device_index=None):
+        """
+        Args:
+            sample_rate (int): Sample rate of the 16-bit mono PCM to play
+            frames_per_buffer (int): Callback period in frames; a stop()
+                                     is heard within one period
+            device_index (int): Output device, None for the default
+        """
+        import pyaudio
+
+        self.sample_rate = sample_rate
+        self.frames_per_buffer = frames_per_buffer
+        self.gain = 1.0
+
+        # Called with every block sent to the speaker, on the audio thread
+        self.reference_listeners = []
+
+        self._pending = deque()  # int16 arrays waiting to be played
+        self._offset = 0         # samples of _pending[0] already played
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._interrupted = False
+
+        # Statistics
+        self.buffers_played = 0
+        self.interruptions = 0
+
+        self._continue = pyaudio.paContinue
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(format=pyaudio.paInt16, channels=1,
+                                      rate=sample_rate, output=True,
+                                      frames_per_buffer=frames_per_buffer,
+                                      output_device_index=device_index,
+                                      stream_callback=self._callback)
+        self.stream.start_stream()
+
+    @property
+    def playing(self):
+        """True while queued audio is being played"""
+        return not self._idle.is_set()
+
+    @property
+    def buffer_seconds(self):
+        """Length of one callback period"""
+        return self.frames_per_buffer / self.sample_rate
+
+    def _next_block(self, frame_count):
+        """Take the next frame_count samples from the queue, padded with silence"""
+        block = np.zeros(frame_count, dtype=np.int16)
+        filled = 0
+
+        with self._lock:
+            while filled < frame_count and self._pending:
+                samples = self._pending[0]
+                n = min(frame_count - filled, samples.size - self._offset)
+                block[filled:filled + n] = samples[self._offset:self._offset + n]
+                filled += n
+                self._offset += n
+                if self._offset == samples.size:
+                    self._pending.popleft()
+                    self._offset = 0
+                    self.buffers_played += 1
+
+            if not self._pending:
+                self._idle.set()
+
+        return block, filled
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback, runs on the audio thread"""
+        block, filled = self._next_block(frame_count)
+
+        if filled and self.gain != 1.0:
+            block = np.clip(block * self.gain, -32768, 32767).astype(np.int16)
+
+        data = block.tobytes()
+        for listener in self.reference_listeners:
+            listener(data)
+
+        return data, self._continue
+
+    def play(self, pcm, wait=True):
+        """
+        Queue PCM for playback
+
+        Args:
+            pcm (bytes-like): 16-bit mono PCM at the engine's sample rate
+            wait (bool): Block until it has been played or stopped
+
+        Returns:
+            bool: False if playback was stopped before the end
+        """
+        samples = np.frombuffer(pcm, dtype='<i2')
+        if samples.size == 0:
+            return True
+
+        with self._lock:
+            if not self._pending:
+                self._interrupted = False
+            self._pending.append(samples)
+            self._idle.clear()
+
+        if wait:
+            return self.wait()
+        return True
+
+    def wait(self, timeout=None):
+        """
+        Wait until the queue has been played or stopped
+
+        Returns:
+            bool: False if playback was stopped
+        """
+        self._idle.wait(timeout)
+        return not self._interrupted
+
+    def stop(self):
+        """Drop all queued audio; silence starts with the next buffer period"""
+        with self._lock:
+            if self._pending:
+                self.interruptions += 1
+                self._interrupted = True
+            self._pending.clear()
+            self._offset = 0
+            self._idle.set()
+
+    def duck(self, gain_db=-15.0):
+        """Lower the output volume, e.g. while the user may be talking"""
+        self.gain = 10.0 ** (gain_db / 20.0)
+
+    def unduck(self):
+        """Restore full output volume"""
+        self.gain = 1.0
+
+    def stats(self):
+        """
+        Output statistics
+
+        Returns:
+            dict: Buffers played, interruptions and current state
+        """
+        return {
+            'buffers_played': self.buffers_played,
+            'interruptions': self.interruptions,
+            'playing': self.playing,
+            'buffer_ms': self.buffer_seconds * 1000,
+        }
+
+    def close(self):
+        """Stop playback and release the output device"""
+        self.stop()
+        self.stream.stop_stream()
+        self.stream.close()
+        self.audio.terminate()
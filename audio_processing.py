@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+"""
+Audio Processing Module - Signal processing in front of the recognizer
+Vectorized NumPy code that runs on every captured chunk
+
+This module provides:
+- VoiceActivityGate: energy / zero-crossing voice activity detection
+  with hangover and pre-roll, so only speech reaches Vosk
+- BargeInDetector: notices the user talking over the assistant's own
+  speech, using the played audio as a reference for the echo
+- LevelMeter: RMS, peak, dBFS and clipping of every chunk, cheap
+  enough to run on the capture thread
+- Preprocessor: DC removal, high-pass filter and automatic gain control
+  with a limiter, applied before the gate and the recognizer
+"""
+
+from collections import deque
+import math
+import struct
+import threading
+import time
+
+import numpy as np
+
+FULL_SCALE = 32768.0
+
+
+class VoiceActivityGate:
+    """
+    Decides which chunks of 16-bit PCM are passed on to the recognizer
+
+    Each chunk is split into short frames. A frame counts as speech when
+    its energy is above the threshold and its zero-crossing rate is below
+    the hiss limit. The gate opens after a few speech frames in a row,
+    replays the pre-roll so word onsets are not lost, and stays open for
+    the hangover time after the last speech frame.
+
+    A segment is closed after max_segment_ms even if it still sounds like
+    speech; noise that is still there then raises the noise floor, so a
+    fan switching on does not hold the gate open.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, threshold_db=-45.0,
+                 noise_margin_db=12.0, max_zcr=0.4, min_speech_frames=3,
+                 hangover_ms=700, preroll_ms=400, adaptive=True,
+                 max_segment_ms=15000):
+        """
+        Args:
+            sample_rate (int): Sample rate of the PCM
+            frame_ms (int): Analysis frame length
+            threshold_db (float): Minimum frame level (dBFS) for speech
+            noise_margin_db (float): With adaptive=True, speech must also be
+                                     this far above the tracked noise floor
+            max_zcr (float): Frames with a higher zero-crossing rate are
+                             treated as noise (fans, hiss)
+            min_speech_frames (int): Consecutive speech frames to open the gate
+            hangover_ms (int): Keep the gate open this long after speech
+            preroll_ms (int): Audio before the onset replayed on opening
+            adaptive (bool): Track the background noise floor
+            max_segment_ms (int): Close the gate after this much audio
+                                  in one segment
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zcr = max_zcr
+        self.min_speech_frames = min_speech_frames
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.preroll_bytes = int(sample_rate * preroll_ms / 1000) * 2
+        self.adaptive = adaptive
+        self.max_segment_frames = max(1, max_segment_ms // frame_ms)
+
+        # Counters
+        self.total_bytes = 0
+        self.passed_bytes = 0
+        self.segments = 0
+        self.forced_closes = 0
+
+        self.reset()
+
+    def reset(self):
+        """Close the gate and forget the pre-roll (counters are kept)"""
+        self.active = False
+        self.segment_ended = False
+        self.noise_floor_db = self.threshold_db - self.noise_margin_db
+        self._speech_run = 0
+        self._silence_run = 0
+        self._segment_frames = 0
+        self._levels_db = np.zeros(0, dtype=np.float32)
+        self._preroll = deque()
+        self._preroll_size = 0
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    def _classify(self, data):
+        """
+        Classify the frames in a chunk
+
+        Returns:
+            np.ndarray: Boolean speech flag per frame
+        """
+        samples = np.frombuffer(data, dtype='<i2')
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+
+        n_frames = samples.size // self.frame_length
+        used = n_frames * self.frame_length
+        self._remainder = samples[used:].copy()
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = samples[:used].reshape(n_frames, self.frame_length)
+        frames = frames.astype(np.float32) / FULL_SCALE
+
+        energy = np.mean(frames * frames, axis=1)
+        level_db = 10.0 * np.log10(energy + 1e-10)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        zcr = zcr / (self.frame_length - 1)
+
+        threshold = self.threshold_db
+        if self.adaptive:
+            threshold = max(threshold, self.noise_floor_db + self.noise_margin_db)
+
+        speech = (level_db > threshold) & (zcr < self.max_zcr)
+        self._levels_db = level_db
+
+        if self.adaptive and not self.active:
+            quiet = level_db[~speech]
+            if quiet.size:
+                # Slow rise, fast fall keeps the floor near the true background
+                target = float(np.median(quiet))
+                rate = 0.05 if target > self.noise_floor_db else 0.5
+                self.noise_floor_db += rate * (target - self.noise_floor_db)
+        elif self.adaptive:
+            # While open, follow the quietest frames (pauses between words)
+            # upwards only, and slowly - a step in stationary noise then
+            # ends up below the threshold instead of latching the gate
+            target = float(np.percentile(level_db, 10))
+            if target > self.noise_floor_db:
+                self.noise_floor_db += 0.02 * (target - self.noise_floor_db)
+
+        return speech
+
+    def process(self, data, analysis=None):
+        """
+        Pass a chunk through the gate
+
+        Args:
+            data (bytes): 16-bit PCM chunk
+            analysis (bytes): Same chunk as the decision should be made
+                              on, e.g. before gain control (default: data)
+
+        Returns:
+            bytes: Audio for the recognizer (including any pre-roll),
+                   or b'' when the chunk is skipped. segment_ended is
+                   True after the chunk that closed the gate.
+        """
+        self.total_bytes += len(data)
+        self.segment_ended = False
+        opened = False
+
+        forced = False
+
+        for is_speech in self._classify(data if analysis is None else analysis):
+            if self.active:
+                self._segment_frames += 1
+                if self._segment_frames >= self.max_segment_frames:
+                    forced = True
+
+            if is_speech:
+                self._speech_run += 1
+                self._silence_run = 0
+                if not self.active and self._speech_run >= self.min_speech_frames:
+                    self.active = True
+                    opened = True
+                    self.segments += 1
+                    self._segment_frames = 0
+            else:
+                self._speech_run = 0
+                if self.active:
+                    self._silence_run += 1
+
+        if self.active or opened:
+            output = data
+            if opened and self._preroll:
+                output = b''.join(self._preroll) + data
+                self._preroll.clear()
+                self._preroll_size = 0
+
+            if self.active and (forced or self._silence_run >= self.hangover_frames):
+                self.active = False
+                self.segment_ended = True
+                self._silence_run = 0
+                self._speech_run = 0
+
+                if forced:
+                    # Too long for a command: take what is still there as
+                    # background, so the gate does not reopen on it at once
+                    self.forced_closes += 1
+                    if self.adaptive and self._levels_db.size:
+                        self.noise_floor_db = max(self.noise_floor_db,
+                                                  float(np.median(self._levels_db)))
+
+            self.passed_bytes += len(output)
+            return output
+
+        # Gate closed - remember the chunk as pre-roll for the next onset
+        self._preroll.append(data)
+        self._preroll_size += len(data)
+        while self._preroll and self._preroll_size - len(self._preroll[0]) >= self.preroll_bytes:
+            self._preroll_size -= len(self._preroll.popleft())
+
+        return b''
+
+    def stats(self):
+        """
+        Gate statistics
+
+        Returns:
+            dict: Seconds of audio seen, passed and skipped
+        """
+        bytes_per_second = self.sample_rate * 2
+        total = self.total_bytes / bytes_per_second
+        passed = min(self.passed_bytes, self.total_bytes) / bytes_per_second
+        return {
+            'total_seconds': total,
+            'passed_seconds': passed,
+            'skipped_seconds': total - passed,
+            'skipped_ratio': (total - passed) / total if total else 0.0,
+            'segments': self.segments,
+            'forced_closes': self.forced_closes,
+            'noise_floor_db': self.noise_floor_db,
+        }
+
+
+def frame_levels(samples, frame_length):
+    """
+    Level of consecutive frames
+
+    Args:
+        samples (np.ndarray): 16-bit samples (a partial last frame is ignored)
+        frame_length (int): Samples per frame
+
+    Returns:
+        np.ndarray: Level per frame in dBFS
+    """
+    n_frames = samples.size // frame_length
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    frames = frames.astype(np.float32) / FULL_SCALE
+    return 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+
+class BargeInDetector:
+    """
+    Detects speech in the microphone signal while the speaker is playing
+
+    The microphone also hears the assistant itself. The detector keeps the
+    levels of the recently played audio (the reference) and tracks how
+    loud that echo arrives at the microphone. A frame only counts as the
+    user talking when it is louder than the expected echo by a margin.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, threshold_db=-40.0,
+                 margin_db=10.0, min_speech_frames=4, echo_window_ms=300):
+        """
+        Args:
+            sample_rate (int): Sample rate of the microphone PCM
+            frame_ms (int): Analysis frame length
+            threshold_db (float): Minimum frame level (dBFS) for speech
+            margin_db (float): How far above the expected echo speech must be
+            min_speech_frames (int): Consecutive speech frames for a barge-in
+            echo_window_ms (int): Played audio this recent can still be
+                                  arriving at the microphone
+        """
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.min_speech_frames = min_speech_frames
+        self.echo_window = echo_window_ms / 1000
+
+        # Echo level at the microphone relative to the reference.
+        # Starts pessimistic and falls as the real coupling is observed.
+        self.coupling_db = 0.0
+
+        self.detections = 0
+        self._reference = deque()  # (time, level dBFS) of played blocks
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the current speech run (the echo estimate is kept)"""
+        self._speech_run = 0
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    def add_reference(self, data):
+        """
+        Record a block that was sent to the speaker
+
+        Meant as an OutputEngine reference listener (any sample rate).
+
+        Args:
+            data (bytes): 16-bit PCM that is being played
+        """
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / FULL_SCALE
+        if samples.size == 0:
+            return
+        level = 10.0 * np.log10(float(np.mean(samples * samples)) + 1e-10)
+
+        now = time.monotonic()
+        with self._lock:
+            self._reference.append((now, level))
+            while self._reference and now - self._reference[0][0] > self.echo_window:
+                self._reference.popleft()
+
+    def _reference_db(self):
+        """Loudest reference level that may still be heard as echo"""
+        now = time.monotonic()
+        with self._lock:
+            levels = [level for t, level in self._reference if now - t <= self.echo_window]
+        return max(levels, default=-100.0)
+
+    def process(self, data):
+        """
+        Analyze a microphone chunk
+
+        Args:
+            data (bytes): 16-bit PCM from the microphone
+
+        Returns:
+            bool: True when the user is talking over the output
+        """
+        samples = np.frombuffer(data, dtype='<i2')
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+        used = samples.size - samples.size % self.frame_length
+        self._remainder = samples[used:].copy()
+        if used == 0:
+            return False
+
+        levels = frame_levels(samples[:used], self.frame_length)
+        reference_db = self._reference_db()
+        expected_echo = reference_db + self.coupling_db
+
+        speech = (levels > self.threshold_db) & (levels > expected_echo + self.margin_db)
+
+        # Learn the coupling from frames that are only echo. Fast rise,
+        # slow fall keeps the estimate on the safe (loud) side.
+        echo = levels[~speech]
+        if echo.size and reference_db > self.threshold_db:
+            observed = float(np.max(echo)) - reference_db
+            rate = 0.5 if observed > self.coupling_db else 0.05
+            self.coupling_db += rate * (observed - self.coupling_db)
+
+        for is_speech in speech:
+            self._speech_run = self._speech_run + 1 if is_speech else 0
+            if self._speech_run >= self.min_speech_frames:
+                self._speech_run = 0
+                self.detections += 1
+                return True
+        return False
+
+
+class LevelMeter:
+    """
+    Signal level of 16-bit PCM chunks
+
+    The samples are read in place with np.frombuffer, so metering a chunk
+    costs a few vectorized passes and no Python loop over samples. Pass
+    process to BufferedSource.add_listener to meter every captured block.
+    """
+
+    def __init__(self, clip_level=32767):
+        """
+        Args:
+            clip_level (int): Sample magnitude that counts as clipped
+        """
+        self.clip_level = clip_level
+        self.reset()
+
+    def reset(self):
+        """Clear the last reading and the running totals"""
+        # Last chunk
+        self.rms = 0.0
+        self.peak = 0
+        self.rms_db = -100.0
+        self.peak_db = -100.0
+        self.clipped = 0
+
+        # Since reset
+        self.chunks = 0
+        self.samples = 0
+        self.max_peak = 0
+        self.total_clipped = 0
+
+    def process(self, data):
+        """
+        Meter a chunk
+
+        Args:
+            data (bytes): 16-bit PCM
+
+        Returns:
+            float: RMS level in dBFS
+        """
+        samples = np.frombuffer(data, dtype='<i2')
+        if samples.size == 0:
+            return self.rms_db
+
+        values = samples.astype(np.float32)
+        self.rms = math.sqrt(float(np.dot(values, values)) / samples.size)
+        self.peak = max(int(samples.max()), -int(samples.min()))
+        self.rms_db = 20.0 * math.log10(self.rms / FULL_SCALE + 1e-10)
+        self.peak_db = 20.0 * math.log10(self.peak / FULL_SCALE + 1e-10)
+        self.clipped = int(np.count_nonzero(samples >= self.clip_level)
+                           + np.count_nonzero(samples <= -self.clip_level))
+
+        self.chunks += 1
+        self.samples += samples.size
+        self.max_peak = max(self.max_peak, self.peak)
+        self.total_clipped += self.clipped
+        return self.rms_db
+
+    def stats(self):
+        """
+        Meter readings
+
+        Returns:
+            dict: Last chunk's levels plus peak and clipping since reset
+        """
+        return {
+            'rms': self.rms,
+            'rms_db': self.rms_db,
+            'peak': self.peak,
+            'peak_db': self.peak_db,
+            'clipped': self.clipped,
+            'max_peak': self.max_peak,
+            'max_peak_db': 20.0 * math.log10(self.max_peak / FULL_SCALE + 1e-10),
+            'clipped_ratio': self.total_clipped / self.samples if self.samples else 0.0,
+        }
+
+
+class _OnePoleRecursion:
+    """
+    s[n] = w[n] + p * s[n-1] for a whole chunk at once
+
+    Unrolled, s[n] = p^(n+1) * s[-1] + p^n * cumsum(w[k] * p^-k), which
+    NumPy evaluates without a per-sample loop. Long chunks are processed
+    in sub-blocks so p^-k stays far from overflowing.
+    """
+
+    def __init__(self, pole, block=4096):
+        self.pole = pole
+        self.block = block
+        k = np.arange(block)
+        self.powers = pole ** k                # p^n
+        self.inverse = pole ** -k              # p^-k
+        self.carry = pole ** (k + 1)           # p^(n+1)
+        self.state = 0.0 * pole
+
+    def process(self, w):
+        out = np.empty(w.size, dtype=np.result_type(w, self.powers))
+        for start in range(0, w.size, self.block):
+            part = w[start:start + self.block]
+            n = part.size
+            s = (self.powers[:n] * np.cumsum(part * self.inverse[:n])
+                 + self.carry[:n] * self.state)
+            out[start:start + n] = s
+            self.state = s[-1]
+        return out
+
+
+class Preprocessor:
+    """
+    Streaming clean-up of microphone audio before the recognizer
+
+    - DC removal: one-pole DC blocker
+    - High-pass: 2nd order Butterworth against rumble and handling noise
+    - AGC: slowly brings speech towards the target level, without
+      boosting silence, followed by a soft limiter
+
+    Filter and gain state - including the partial AGC frame at the end
+    of a chunk - is carried across chunks, so the chunk size doesn't
+    change the result (apart from floating point rounding).
+
+    The gain only moves while adapt is True. SpeechRecognizer clears it
+    while the voice activity gate is closed, so the AGC learns the level
+    of speech, not of the room noise. unboosted holds the last chunk
+    before the AGC, for the gate to analyse.
+    """
+
+    def __init__(self, sample_rate=16000, dc_removal=True, highpass_hz=80.0,
+                 agc=True, target_db=-20.0, max_gain_db=30.0, min_gain_db=-10.0,
+                 gate_db=-50.0, attack_ms=50, release_ms=1500, limit_db=-1.0,
+                 frame_ms=10, budget_ms=1.0):
+        """
+        Args:
+            sample_rate (int): Sample rate of the PCM
+            dc_removal (bool): Remove DC offset
+            highpass_hz (float): High-pass cutoff, None to disable
+            agc (bool): Enable automatic gain control
+            target_db (float): Speech level (dBFS) the AGC aims for
+            max_gain_db (float): Largest boost
+            min_gain_db (float): Largest cut
+            gate_db (float): Frames below this (after current gain is
+                             removed) don't move the gain
+            attack_ms (int): Time constant for lowering the gain
+            release_ms (int): Time constant for raising the gain
+            limit_db (float): Soft limiter threshold
+            frame_ms (int): AGC analysis frame length
+            budget_ms (float): Per-chunk processing time to stay under
+                               (chunks over it are counted)
+        """
+        self.sample_rate = sample_rate
+        self.agc = agc
+        self.target_db = target_db
+        self.max_gain_db = max_gain_db
+        self.min_gain_db = min_gain_db
+        self.gate_db = gate_db
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.attack = 1.0 - math.exp(-frame_ms / attack_ms)
+        self.release = 1.0 - math.exp(-frame_ms / release_ms)
+        self.limit = 10.0 ** (limit_db / 20.0)
+        self.budget_ms = budget_ms
+
+        # DC blocker: y[n] = x[n] - x[n-1] + R * y[n-1]
+        self._dc = _OnePoleRecursion(0.995) if dc_removal else None
+        self._dc_last = 0.0
+
+        # High-pass biquad: numerator b0 * (1 - 2z^-1 + z^-2), poles p and conj(p)
+        self._hp = None
+        if highpass_hz:
+            w0 = 2.0 * math.pi * highpass_hz / sample_rate
+            alpha = math.sin(w0) / (2.0 * math.sqrt(0.5))  # Q = 1/sqrt(2)
+            a0 = 1.0 + alpha
+            self._hp_b0 = (1.0 + math.cos(w0)) / 2.0 / a0
+            a1 = -2.0 * math.cos(w0) / a0
+            a2 = (1.0 - alpha) / a0
+            pole = complex(-a1 / 2.0, math.sqrt(max(0.0, a2 - a1 * a1 / 4.0)))
+            # 1/((1 - p z^-1)(1 - p* z^-1)) = 2 Re(c / (1 - p z^-1))
+            self._hp_c = pole / (pole - pole.conjugate())
+            self._hp = _OnePoleRecursion(pole)
+            self._hp_history = np.zeros(2)
+
+        self.gain_db = 0.0
+        self.adapt = True
+        self.unboosted = b''
+
+        # AGC frame in progress and the gain ramp over it (linear)
+        self._frame_fill = 0
+        self._frame_energy = 0.0
+        self._ramp = (1.0, 1.0)
+
+        # Statistics
+        self.chunks = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.over_budget = 0
+        self.limited_samples = 0
+
+    def reset(self):
+        """Forget the filter and gain state (statistics are kept)"""
+        if self._dc is not None:
+            self._dc.state = 0.0 * self._dc.pole
+            self._dc_last = 0.0
+        if self._hp is not None:
+            self._hp.state = 0.0 * self._hp.pole
+            self._hp_history = np.zeros(2)
+
+        self.gain_db = 0.0
+        self.adapt = True
+        self.unboosted = b''
+        self._frame_fill = 0
+        self._frame_energy = 0.0
+        self._ramp = (1.0, 1.0)
+
+    def _filter(self, x):
+        """DC removal and high-pass, state kept across calls"""
+        if self._dc is not None:
+            diff = np.diff(x, prepend=self._dc_last)
+            self._dc_last = x[-1]
+            x = self._dc.process(diff)
+
+        if self._hp is not None:
+            padded = np.concatenate((self._hp_history, x))
+            w = self._hp_b0 * (padded[2:] - 2.0 * padded[1:-1] + padded[:-2])
+            self._hp_history = padded[-2:]
+            x = 2.0 * (self._hp_c * self._hp.process(w)).real
+
+        return x
+
+    def _apply_agc(self, x):
+        """
+        Move the gain frame by frame and apply it with ramps
+
+        Frames are counted across chunks. Over each frame the gain ramps
+        between the values after the two frames before it, so it is known
+        when the frame starts, wherever the chunk boundaries fall.
+        """
+        length = self.frame_length
+        position = np.arange(self._frame_fill, self._frame_fill + x.size)
+        frame = position // length
+        completed = (self._frame_fill + x.size) // length
+
+        energy = np.bincount(frame, weights=x * x)
+        energy[0] += self._frame_energy
+
+        gains = list(self._ramp)
+        for total in energy[:completed].tolist():
+            level = 10.0 * math.log10(total / length + 1e-10)
+            if self.adapt and level > self.gate_db:
+                wanted = self.target_db - level
+                wanted = min(self.max_gain_db, max(self.min_gain_db, wanted))
+                rate = self.attack if wanted < self.gain_db else self.release
+                self.gain_db += rate * (wanted - self.gain_db)
+            gains.append(10.0 ** (self.gain_db / 20.0))
+
+        self._ramp = (gains[completed], gains[completed + 1])
+        self._frame_energy = energy[completed] if completed < energy.size else 0.0
+        self._frame_fill = (self._frame_fill + x.size) % length
+
+        # Linear ramp between frame gains avoids zipper noise
+        gains = np.asarray(gains)
+        start = gains[frame]
+        phase = (position % length) / length
+        return x * (start + (gains[frame + 1] - start) * phase)
+
+    def _limit(self, x):
+        """Soft-knee limiter above the threshold"""
+        over = np.abs(x) > self.limit
+        if over.any():
+            self.limited_samples += int(np.count_nonzero(over))
+            headroom = 1.0 - self.limit
+            magnitude = np.abs(x[over])
+            x[over] = np.sign(x[over]) * (
+                self.limit + headroom * np.tanh((magnitude - self.limit) / headroom))
+        return x
+
+    def process(self, data):
+        """
+        Process a chunk
+
+        Args:
+            data (bytes): 16-bit PCM
+
+        Returns:
+            bytes: Processed 16-bit PCM of the same length
+        """
+        start = time.perf_counter()
+
+        samples = np.frombuffer(data, dtype='<i2')
+        if samples.size == 0:
+            return data
+
+        x = samples / FULL_SCALE
+        x = self._filter(x)
+        if self.agc:
+            self.unboosted = self._to_pcm(x)
+            x = self._apply_agc(x)
+        x = self._limit(x)
+
+        out = self._to_pcm(x)
+        if not self.agc:
+            self.unboosted = out
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.chunks += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if elapsed_ms > self.budget_ms:
+            self.over_budget += 1
+
+        return out
+
+    @staticmethod
+    def _to_pcm(x):
+        return np.clip(np.round(x * FULL_SCALE), -32768, 32767).astype('<i2').tobytes()
+
+    def stats(self):
+        """
+        Preprocessing statistics
+
+        Returns:
+            dict: Current gain and per-chunk processing time
+        """
+        return {
+            'gain_db': self.gain_db,
+            'chunks': self.chunks,
+            'mean_ms': self.total_ms / self.chunks if self.chunks else 0.0,
+            'max_ms': self.max_ms,
+            'over_budget': self.over_budget,
+            'limited_samples': self.limited_samples,
+        }
+
+
+def benchmark_level_meter(chunk_frames=4096, rounds=200, seed=0):
+    """
+    Compare LevelMeter with unpacking samples via struct and summing in Python
+
+    Args:
+        chunk_frames (int): Samples per chunk
+        rounds (int): Chunks to meter
+        seed (int): Random seed for the test signal
+
+    Returns:
+        dict: Microseconds per chunk for both methods
+    """
+    rng = np.random.default_rng(seed)
+    data = (rng.standard_normal(chunk_frames) * 3000).astype('<i2').tobytes()
+
+    print("\n" + "="*50)
+    print(f"Level Meter Benchmark ({chunk_frames} frames per chunk)")
+    print("="*50 + "\n")
+
+    meter = LevelMeter()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        meter.process(data)
+    numpy_us = (time.perf_counter() - start) / rounds * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        shorts = struct.unpack("%dh" % chunk_frames, data)
+        rms = math.sqrt(sum(s**2 for s in shorts) / chunk_frames)
+    python_us = (time.perf_counter() - start) / rounds * 1e6
+
+    print(f"   LevelMeter:     {numpy_us:8.1f} µs per chunk (RMS {meter.rms:.0f})")
+    print(f"   struct + sum:   {python_us:8.1f} µs per chunk (RMS {rms:.0f})")
+    print(f"   Speedup:        {python_us / numpy_us:8.1f}x")
+    print("\n" + "="*50 + "\n")
+
+    return {
+        'numpy_us': numpy_us,
+        'python_us': python_us,
+    }
+
+
+if __name__ == "__main__":
+    # Run benchmark when this file is executed directly
+    benchmark_level_meter()
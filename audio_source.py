@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Audio Source Module - Pluggable audio input for the ASR module
+Lets the speech recognizer read from a microphone, a recorded file or a pipe
+
+This module provides:
+- PyAudioSource: live microphone input (the original behaviour)
+- WavFileSource: replay of recorded WAV or raw PCM files
+- PipeSource: raw PCM from stdin or a named pipe (FIFO)
+
+Every source delivers 16-bit mono PCM as bytes. An empty read means
+the source has no more audio (end of file / pipe closed).
+"""
+
+import os
+import sys
+import time
+import wave
+
+
+class AudioSource:
+    """
+    Base class for all audio sources used by SpeechRecognizer
+    """
+
+    sample_width = 2  # 16-bit PCM
+    channels = 1
+
+    def __init__(self, sample_rate=16000):
+        """
+        Args:
+            sample_rate (int): Sample rate of the delivered PCM
+        """
+        self.sample_rate = sample_rate
+
+        # Live sources (microphones) never run out of audio
+        self.is_live = False
+
+    def read(self, num_frames):
+        """
+        Read audio from the source
+
+        Args:
+            num_frames (int): Number of frames (samples) to read
+
+        Returns:
+            bytes: 16-bit PCM, empty when the source is exhausted
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the underlying device or file"""
+        pass
+
+    def describe(self):
+        """Short human readable description of the source"""
+        return self.__class__.__name__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PyAudioSource(AudioSource):
+    """
+    Live microphone input through PyAudio
+    """
+
+    def __init__(self, sample_rate=16000, chunk_size=8192, device_index=None):
+        """
+        Open the microphone stream
+
+        Args:
+            sample_rate (int): Capture sample rate
+            chunk_size (int): PyAudio buffer size in frames
+            device_index (int): Input device, or None for the default one
+        """
+        super().__init__(sample_rate)
+        self.is_live = True
+        self.chunk_size = chunk_size
+
+        # Imported here so file and pipe sources work without PyAudio
+        import pyaudio
+
+        self.audio = pyaudio.PyAudio()
+
+        if device_index is None:
+            device_index = self._find_microphone()
+        self.mic_index = device_index
+
+        self.stream = self.audio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.mic_index,
+            frames_per_buffer=self.chunk_size
+        )
+
+    def _find_microphone(self):
+        """
+        Find the USB microphone device
+
+        Returns:
+            int: Device index of the microphone
+        """
+        info = self.audio.get_host_api_info_by_index(0)
+        num_devices = info.get('deviceCount')
+
+        print(f"   Found {num_devices} audio devices")
+
+        # List all input devices
+        for i in range(num_devices):
+            device_info = self.audio.get_device_info_by_host_api_device_index(0, i)
+            if device_info.get('maxInputChannels') > 0:
+                print(f"   Device {i}: {device_info.get('name')}")
+
+        # For now, use default input device
+        # You can modify this to select specific device
+        default_device = self.audio.get_default_input_device_info()
+        return default_device['index']
+
+    def read(self, num_frames):
+        return self.stream.read(num_frames, exception_on_overflow=False)
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.audio.terminate()
+
+    def describe(self):
+        return f"microphone (device {self.mic_index})"
+
+
+class WavFileSource(AudioSource):
+    """
+    Recorded audio from a WAV file or a headerless raw PCM file
+    """
+
+    def __init__(self, path, sample_rate=16000, realtime=False):
+        """
+        Open a recorded file
+
+        Args:
+            path (str): WAV file, or raw 16-bit mono PCM (.raw / .pcm)
+            sample_rate (int): Sample rate to assume for raw PCM files
+            realtime (bool): Pace reads to wall-clock time like a microphone.
+                             Leave False to decode faster than real time.
+        """
+        super().__init__(sample_rate)
+        self.path = path
+        self.realtime = realtime
+        self._wav = None
+        self._raw = None
+
+        if path.lower().endswith(('.raw', '.pcm')):
+            self._raw = open(path, 'rb')
+        else:
+            self._wav = wave.open(path, 'rb')
+
+            if self._wav.getsampwidth() != self.sample_width:
+                raise ValueError(f"{path}: expected 16-bit PCM, "
+                                 f"got {8 * self._wav.getsampwidth()}-bit")
+            if self._wav.getnchannels() != self.channels:
+                raise ValueError(f"{path}: expected mono audio, "
+                                 f"got {self._wav.getnchannels()} channels")
+
+            self.sample_rate = self._wav.getframerate()
+
+        self._start_time = None
+        self._frames_read = 0
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds"""
+        if self._wav is not None:
+            return self._wav.getnframes() / self.sample_rate
+        size = os.path.getsize(self.path)
+        return size / (self.sample_width * self.sample_rate)
+
+    def read(self, num_frames):
+        if self._wav is not None:
+            data = self._wav.readframes(num_frames)
+        else:
+            data = self._raw.read(num_frames * self.sample_width)
+
+        if self.realtime and data:
+            if self._start_time is None:
+                self._start_time = time.monotonic()
+            self._frames_read += len(data) // self.sample_width
+
+            # Sleep until the audio we just returned would have been captured
+            due = self._start_time + self._frames_read / self.sample_rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        return data
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+        if self._raw is not None:
+            self._raw.close()
+
+    def describe(self):
+        return f"file {self.path}"
+
+
+class PipeSource(AudioSource):
+    """
+    Raw 16-bit mono PCM from stdin or a named pipe
+
+    Example:
+        arecord -f S16_LE -r 16000 -c 1 -t raw | python3 asr_module.py -
+    """
+
+    def __init__(self, path='-', sample_rate=16000):
+        """
+        Args:
+            path (str): FIFO path, or '-' for stdin
+            sample_rate (int): Sample rate of the incoming PCM
+        """
+        super().__init__(sample_rate)
+        self.path = path
+        self.is_live = True
+
+        if path == '-':
+            self._pipe = sys.stdin.buffer
+            self._owns_pipe = False
+        else:
+            self._pipe = open(path, 'rb')
+            self._owns_pipe = True
+
+    def read(self, num_frames):
+        wanted = num_frames * self.sample_width
+        data = self._pipe.read(wanted)
+
+        # Never hand out half a sample
+        if len(data) % self.sample_width:
+            data = data[:-(len(data) % self.sample_width)]
+
+        return data
+
+    def close(self):
+        if self._owns_pipe:
+            self._pipe.close()
+
+    def describe(self):
+        return "stdin" if self.path == '-' else f"pipe {self.path}"
+
+
+def open_source(spec, sample_rate=16000, realtime=False):
+    """
+    Create an audio source from a short specification string
+
+    Args:
+        spec (str): 'mic' (default microphone), '-' (stdin),
+                    a FIFO path, or a WAV / raw PCM file path
+        sample_rate (int): Sample rate for microphone and raw PCM input
+        realtime (bool): Pace file playback to wall-clock time
+
+    Returns:
+        AudioSource: The opened source
+    """
+    if spec in (None, 'mic'):
+        return PyAudioSource(sample_rate=sample_rate)
+
+    if spec == '-':
+        return PipeSource('-', sample_rate=sample_rate)
+
+    if os.path.exists(spec) and _is_fifo(spec):
+        return PipeSource(spec, sample_rate=sample_rate)
+
+    return WavFileSource(spec, sample_rate=sample_rate, realtime=realtime)
+
+
+def _is_fifo(path):
+    """Check whether a path is a named pipe"""
+    import stat
+    return stat.S_ISFIFO(os.stat(path).st_mode)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Backends Module - Registry of the assistant's ASR, intent and TTS backends
+Lets main.py pick real, file-replay or mock implementations by name
+
+This module:
+- Keeps a registry of factory functions per kind ('asr', 'intent', 'tts')
+- Imports heavy dependencies (vosk, pyaudio, libespeak-ng) only inside
+  the factory that needs them, so unused backends cost nothing
+- Provides mock backends for running the pipeline without hardware
+"""
+
+import time
+
+# kind -> name -> factory(**options)
+BACKENDS = {'asr': {}, 'intent': {}, 'tts': {}}
+
+
+def register_backend(kind, name):
+    """
+    Decorator registering a backend factory
+
+    Args:
+        kind (str): 'asr', 'intent' or 'tts'
+        name (str): Name used to select the backend
+    """
+    def decorator(factory):
+        BACKENDS[kind][name] = factory
+        return factory
+    return decorator
+
+
+def available_backends(kind):
+    """Names of the registered backends of one kind"""
+    return sorted(BACKENDS[kind])
+
+
+def create_backend(kind, name, **options):
+    """
+    Build a backend
+
+    Args:
+        kind (str): 'asr', 'intent' or 'tts'
+        name (str): Registered backend name
+        **options: Passed to the factory (unknown options are ignored)
+
+    Returns:
+        object: The backend instance
+    """
+    try:
+        factory = BACKENDS[kind][name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} backend '{name}' "
+                         f"(available: {', '.join(available_backends(kind))})")
+    return factory(**options)
+
+
+# ---------------------------------------------------------------- ASR
+
+@register_backend('asr', 'vosk')
+def _vosk_recognizer(model_path="/home/pi/vosk-model-hindi", model_server=None, **options):
+    """Vosk on the microphone"""
+    from asr_module import SpeechRecognizer
+    return SpeechRecognizer(model_path=model_path, spare_recognizer=True,
+                            model_server=model_server)
+
+
+@register_backend('asr', 'replay')
+def _replay_recognizer(model_path="/home/pi/vosk-model-hindi", input_path=None,
+                       model_server=None, **options):
+    """Vosk on a recording (WAV/raw file, FIFO or '-' for stdin), paced in real time"""
+    if not input_path:
+        raise ValueError("The replay backend needs an input file (--input)")
+
+    from asr_module import SpeechRecognizer
+    from audio_source import open_source
+    return SpeechRecognizer(model_path=model_path,
+                            source=open_source(input_path, realtime=True),
+                            vad=True, preprocess=True, model_server=model_server)
+
+
+class MockRecognizer:
+    """
+    Stands in for SpeechRecognizer: hears nothing, or the given lines
+    """
+
+    def __init__(self, utterances=(), delay=0.5):
+        """
+        Args:
+            utterances (iterable): Texts returned by successive listen() calls
+            delay (float): Simulated listening time per call
+        """
+        self.utterances = list(utterances)
+        self.delay = delay
+        self.source_exhausted = False
+
+    def listen(self, timeout=None, early_intent=None, trace=None, **kwargs):
+        """Simulate waiting for speech"""
+        time.sleep(self.delay)
+        if self.utterances:
+            if trace is not None:
+                trace.mark('endpoint')
+            return self.utterances.pop(0)
+        return None
+
+    def enable_wake_word(self, phrases):
+        pass
+
+    def wait_for_wake_word(self, timeout=None):
+        """Every utterance counts as addressed to us"""
+        return not self.source_exhausted
+
+    def close(self):
+        pass
+
+
+@register_backend('asr', 'mock')
+def _mock_recognizer(utterances=(), **options):
+    return MockRecognizer(utterances)
+
+
+# ------------------------------------------------------------- Intent
+
+@register_backend('intent', 'rules')
+def _rule_intents(**options):
+    """Pattern-based IntentHandler"""
+    from intent_handler import IntentHandler
+    return IntentHandler()
+
+
+class MockIntentHandler:
+    """
+    Stands in for IntentHandler: understands nothing
+    """
+
+    def process(self, text):
+        return "unknown", "मुझे समझ नहीं आया"  # "I don't understand"
+
+
+@register_backend('intent', 'mock')
+def _mock_intents(**options):
+    return MockIntentHandler()
+
+
+# ---------------------------------------------------------------- TTS
+
+@register_backend('tts', 'espeak')
+def _espeak_speaker(voice='hi', speed=150, **options):
+    """eSpeak-NG with phrase cache and in-process audio output"""
+    from tts_module import TextToSpeech
+    return TextToSpeech(voice=voice, speed=speed)
+
+
+class MockSpeaker:
+    """
+    Stands in for TextToSpeech: prints instead of speaking
+    """
+
+    def speak(self, text, trace=None):
+        if trace is not None:
+            trace.mark('first_audio')
+        print(f"🔊 Speaking: {text}")
+        return True
+
+    def close(self):
+        pass
+
+
+@register_backend('tts', 'mock')
+def _mock_speaker(**options):
+    return MockSpeaker()
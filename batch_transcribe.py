@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Batch Transcription - Offline re-transcription of recorded Hindi audio
+Uses every CPU core with one shared Vosk model
+
+This module:
+- Collects WAV files from a directory or a manifest
+- Loads the Vosk model once and shares it with a pool of worker processes
+- Gives each worker its own KaldiRecognizer
+- Streams one JSON line per file with the text and timing
+
+Usage:
+    python3 batch_transcribe.py recordings/ -o results.jsonl
+    python3 batch_transcribe.py manifest.jsonl --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from vosk import Model, KaldiRecognizer
+
+from audio_source import WavFileSource
+
+# Per-process state. The model is loaded in the parent before the pool
+# forks, so workers share its memory pages instead of loading it again.
+_model = None
+_grammar = None
+_recognizers = {}
+
+
+def find_audio_files(path):
+    """
+    Collect audio files to transcribe
+
+    Args:
+        path (str): A directory (searched recursively for .wav/.raw/.pcm),
+                    a text manifest with one path per line, or a JSONL
+                    manifest with a "path" key per line
+
+    Returns:
+        list: Manifest entries as dicts, each with at least a "path" key
+    """
+    if os.path.isdir(path):
+        entries = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(('.wav', '.raw', '.pcm')):
+                    entries.append({'path': os.path.join(root, name)})
+        return entries
+
+    return read_manifest(path)
+
+
+def read_manifest(manifest_path):
+    """
+    Read a manifest file
+
+    Relative paths are resolved against the manifest's directory. Extra
+    JSON keys (e.g. expected text or intent) are kept on the entry.
+
+    Args:
+        manifest_path (str): Text or JSONL manifest
+
+    Returns:
+        list: Manifest entries as dicts
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    entries = []
+
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            if line.startswith('{'):
+                entry = json.loads(line)
+            else:
+                entry = {'path': line}
+
+            if not os.path.isabs(entry['path']):
+                entry['path'] = os.path.join(base_dir, entry['path'])
+            entries.append(entry)
+
+    return entries
+
+
+def _init_worker(model_path, grammar):
+    """Pool initializer - only loads the model if it was not inherited"""
+    global _model, _grammar
+    if _model is None:
+        _model = Model(model_path)
+    _grammar = grammar
+
+
+def _get_recognizer(sample_rate):
+    """Return this worker's recognizer for a sample rate, reset for reuse"""
+    recognizer = _recognizers.get(sample_rate)
+    if recognizer is None:
+        if _grammar is not None:
+            grammar_json = json.dumps(_grammar, ensure_ascii=False)
+            recognizer = KaldiRecognizer(_model, sample_rate, grammar_json)
+        else:
+            recognizer = KaldiRecognizer(_model, sample_rate)
+        _recognizers[sample_rate] = recognizer
+    else:
+        recognizer.Reset()
+    return recognizer
+
+
+def transcribe_file(entry, chunk_frames=4000):
+    """
+    Transcribe one file with this process's recognizer
+
+    Args:
+        entry (dict): Manifest entry with a "path" key
+        chunk_frames (int): Frames fed to the recognizer per call
+
+    Returns:
+        dict: The entry plus text, audio_seconds, decode_seconds, rtf
+              and error (None on success)
+    """
+    result = dict(entry)
+    result['text'] = None
+    result['error'] = None
+    result['worker'] = os.getpid()
+
+    start = time.perf_counter()
+    try:
+        with WavFileSource(entry['path']) as source:
+            recognizer = _get_recognizer(source.sample_rate)
+            frames = 0
+            segments = []
+
+            while True:
+                data = source.read(chunk_frames)
+                if not data:
+                    break
+                frames += len(data) // source.sample_width
+
+                if recognizer.AcceptWaveform(data):
+                    text = json.loads(recognizer.Result()).get('text', '')
+                    if text:
+                        segments.append(text)
+
+            text = json.loads(recognizer.FinalResult()).get('text', '')
+            if text:
+                segments.append(text)
+
+            result['text'] = ' '.join(segments)
+            result['audio_seconds'] = round(frames / source.sample_rate, 3)
+
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result.setdefault('audio_seconds', 0.0)
+
+    decode_seconds = time.perf_counter() - start
+    result['decode_seconds'] = round(decode_seconds, 4)
+    if result['audio_seconds']:
+        result['rtf'] = round(decode_seconds / result['audio_seconds'], 4)
+    else:
+        result['rtf'] = None
+
+    return result
+
+
+def transcribe_batch(entries, model_path, workers=None, grammar=None):
+    """
+    Transcribe many files in parallel
+
+    Results are yielded as soon as each file finishes, so the order
+    differs from the input order when workers > 1.
+
+    Args:
+        entries (list): Manifest entries (see find_audio_files)
+        model_path (str): Path to the Vosk model
+        workers (int): Worker processes, defaults to the CPU count
+        grammar (list): Restrict decoding to these phrases (command mode)
+
+    Yields:
+        dict: One result per entry (see transcribe_file)
+    """
+    global _model, _grammar
+
+    workers = workers or os.cpu_count() or 1
+
+    # Load once here; forked workers inherit the model copy-on-write
+    if _model is None:
+        _model = Model(model_path)
+    _grammar = grammar
+
+    if workers == 1:
+        for entry in entries:
+            yield transcribe_file(entry)
+        return
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        # Without fork each worker has to load its own copy
+        context = multiprocessing.get_context()
+
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(model_path, grammar)) as pool:
+        for result in pool.imap_unordered(transcribe_file, entries):
+            yield result
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Transcribe recorded Hindi audio with Vosk on all CPU cores")
+    parser.add_argument('input',
+                        help="directory of WAV files, or a text/JSONL manifest")
+    parser.add_argument('-m', '--model', default="/home/pi/vosk-model-hindi",
+                        help="path to the Vosk model")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="JSONL output file (default: stdout)")
+    parser.add_argument('--command-mode', action='store_true',
+                        help="decode with the grammar built from IntentHandler")
+    args = parser.parse_args()
+
+    entries = find_audio_files(args.input)
+    if not entries:
+        print(f"❌ No audio files found in {args.input}", file=sys.stderr)
+        return 1
+
+    grammar = None
+    if args.command_mode:
+        from intent_handler import IntentHandler
+        grammar = IntentHandler().get_grammar_phrases() + ['[unk]']
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"📂 Transcribing {len(entries)} files with {workers} workers...",
+          file=sys.stderr)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+
+    start = time.perf_counter()
+    audio_total = 0.0
+    decode_total = 0.0
+    errors = 0
+
+    try:
+        for result in transcribe_batch(entries, args.model, workers, grammar):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+
+            audio_total += result['audio_seconds']
+            decode_total += result['decode_seconds']
+            if result['error']:
+                errors += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    wall = time.perf_counter() - start
+
+    print("=" * 50, file=sys.stderr)
+    print(f"   Files: {len(entries)} ({errors} errors)", file=sys.stderr)
+    print(f"   Audio: {audio_total:.1f} s", file=sys.stderr)
+    print(f"   Wall time: {wall:.1f} s", file=sys.stderr)
+    if wall > 0:
+        print(f"   Speedup vs sequential: {decode_total / wall:.2f}x", file=sys.stderr)
+    if audio_total > 0:
+        print(f"   Real-time factor: {wall / audio_total:.3f}", file=sys.stderr)
+    print("=" * 50, file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
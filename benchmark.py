@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Repeatable measurement of the full voice pipeline
+Replays recorded commands through ASR, intent and TTS (to a buffer)
+
+This module:
+- Reads a manifest of recordings with the expected intent (and text)
+- Runs each one through SpeechRecognizer (with preprocessing and VAD),
+  IntentHandler and TextToSpeech synthesis, tracing every stage
+- Reports real-time factors, stage latency percentiles, intent accuracy,
+  word error rate, CPU time and peak memory
+- Writes the results as JSON, and compares them with an earlier run
+
+Manifest (JSONL, paths relative to the manifest):
+    {"path": "time_01.wav", "intent": "time", "text": "समय क्या है"}
+
+Usage:
+    python3 benchmark.py commands.jsonl -o results.json
+    python3 benchmark.py commands.jsonl --compare baseline.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from batch_transcribe import read_manifest
+from fuzzy_matcher import edit_distance
+from text_normalizer import normalize_text
+from tracing import Tracer
+
+# Summary metrics compared between runs, and whether higher is better
+COMPARED_METRICS = {
+    'asr_rtf': False,
+    'tts_rtf': False,
+    'intent_accuracy': True,
+    'word_error_rate': False,
+    'cpu_seconds': False,
+    'peak_rss_mb': False,
+}
+
+
+def _git_revision():
+    """Commit the benchmark runs on, if known"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def word_errors(expected, recognized):
+    """
+    Word-level edit distance after normalization
+
+    Returns:
+        tuple: (errors, number of expected words)
+    """
+    expected_words = normalize_text(expected).split()
+    recognized_words = normalize_text(recognized or '').split()
+    return edit_distance(expected_words, recognized_words), len(expected_words)
+
+
+def run_benchmark(entries, model_path="/home/pi/vosk-model-hindi", seed=0,
+                  tts=True, model_server=None, trace_path=None):
+    """
+    Run every manifest entry through the pipeline
+
+    Args:
+        entries (list): Manifest entries (path, optional intent and text)
+        model_path (str): Path to the Vosk model
+        seed (int): Seed for the random response choices
+        tts (bool): Also synthesize the responses
+        model_server (str): Socket of a running model server
+        trace_path (str): JSONL file for the per-utterance traces
+
+    Returns:
+        dict: 'meta', 'summary', 'stages' and per-'utterances' results
+    """
+    from asr_module import SpeechRecognizer
+    from audio_source import WavFileSource
+    from intent_handler import IntentHandler
+
+    random.seed(seed)
+    cpu_start = _cpu_seconds()
+    wall_start = time.perf_counter()
+
+    asr = SpeechRecognizer(model_path, source=WavFileSource(entries[0]['path']),
+                           vad=True, preprocess=True, model_server=model_server)
+    handler = IntentHandler()
+    speaker = None
+    if tts:
+        from tts_module import TextToSpeech
+
+        # No cache: every response is synthesized, as on a cold start
+        speaker = TextToSpeech(cache_dir=None, cache_bytes=0, audio_output=False)
+
+    tracer = Tracer(trace_path, window=max(1000, len(entries)))
+    results = []
+    totals = {'audio': 0.0, 'decoded': 0.0, 'asr': 0.0, 'speech': 0.0, 'synthesis': 0.0,
+              'word_errors': 0, 'words': 0, 'correct': 0, 'labelled': 0}
+
+    for index, entry in enumerate(entries):
+        if index:
+            asr.use_source(WavFileSource(entry['path']))
+        audio_seconds = asr.source.duration
+
+        trace = tracer.start()
+
+        # ASR: first utterance of the recording. The real-time factor is
+        # taken over the audio read up to its end, not the whole file.
+        start = time.perf_counter()
+        bytes_before = asr.bytes_read
+        text = None
+        while text is None and not asr.source_exhausted:
+            text = asr.listen(trace=trace)
+        asr_seconds = time.perf_counter() - start
+        decoded_seconds = (asr.bytes_read - bytes_before) / 2 / asr.sample_rate
+
+        # Intent
+        with trace.span('intent'):
+            intent, response = handler.process(text)
+
+        # TTS to a buffer
+        speech_seconds = 0.0
+        if speaker is not None:
+            start = time.perf_counter_ns()
+            pcm = speaker.get_audio(response, persist=False)
+            trace.add('synthesis', time.perf_counter_ns() - start)
+            trace.mark('first_audio')
+            speech_seconds = len(pcm) / 2 / speaker.sample_rate
+            totals['speech'] += speech_seconds
+            totals['synthesis'] += trace.durations['synthesis'] / 1e9
+
+        result = {
+            'path': entry['path'],
+            'text': text,
+            'intent': intent,
+            'audio_seconds': audio_seconds,
+            'decoded_seconds': decoded_seconds,
+            'asr_rtf': asr_seconds / decoded_seconds if decoded_seconds else None,
+            'speech_seconds': speech_seconds,
+        }
+
+        if 'intent' in entry:
+            result['expected_intent'] = entry['intent']
+            result['correct'] = intent == entry['intent']
+            totals['labelled'] += 1
+            totals['correct'] += result['correct']
+
+        if 'text' in entry:
+            errors, words = word_errors(entry['text'], text)
+            result['word_errors'] = errors
+            totals['word_errors'] += errors
+            totals['words'] += words
+
+        tracer.finish(trace, path=entry['path'], intent=intent)
+        result.update(trace.to_dict())
+        results.append(result)
+
+        totals['audio'] += audio_seconds
+        totals['decoded'] += decoded_seconds
+        totals['asr'] += asr_seconds
+
+    asr.close()
+    if speaker is not None:
+        speaker.close()
+    tracer.close()
+
+    summary = {
+        'utterances': len(results),
+        'audio_seconds': totals['audio'],
+        'decoded_seconds': totals['decoded'],
+        'asr_seconds': totals['asr'],
+        'asr_rtf': totals['asr'] / totals['decoded'] if totals['decoded'] else None,
+        'tts_rtf': (totals['synthesis'] / totals['speech']
+                    if totals['speech'] else None),
+        'intent_accuracy': (totals['correct'] / totals['labelled']
+                            if totals['labelled'] else None),
+        'word_error_rate': (totals['word_errors'] / totals['words']
+                            if totals['words'] else None),
+        'cpu_seconds': _cpu_seconds() - cpu_start,
+        'wall_seconds': time.perf_counter() - wall_start,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': seed,
+            'model_path': model_path,
+            'tts': tts,
+        },
+        'summary': summary,
+        'stages': tracer.summary(),
+        'utterances': results,
+    }
+
+
+def compare_results(baseline, current, tolerance=0.05):
+    """
+    Compare the summary metrics of two runs
+
+    Args:
+        baseline (dict): Earlier run_benchmark() result
+        current (dict): New result
+        tolerance (float): Relative change still counted as unchanged
+
+    Returns:
+        list: (metric, old, new, relative change, regressed) per metric
+    """
+    rows = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old = baseline['summary'].get(metric)
+        new = current['summary'].get(metric)
+        if old is None or new is None:
+            continue
+
+        change = (new - old) / old if old else 0.0
+        worse = change < -tolerance if higher_is_better else change > tolerance
+        rows.append((metric, old, new, change, worse))
+    return rows
+
+
+def print_summary(results, file=sys.stderr):
+    """Human-readable report"""
+    summary = results['summary']
+
+    def show(value, fmt):
+        return 'n/a' if value is None else format(value, fmt)
+
+    print("=" * 50, file=file)
+    print(f"   Revision: {results['meta']['revision']}", file=file)
+    print(f"   Utterances: {summary['utterances']} "
+          f"({summary['audio_seconds']:.1f} s of audio)", file=file)
+    print(f"   ASR real-time factor: {show(summary['asr_rtf'], '.3f')}", file=file)
+    print(f"   TTS real-time factor: {show(summary['tts_rtf'], '.3f')}", file=file)
+    print(f"   Intent accuracy: {show(summary['intent_accuracy'], '.1%')}", file=file)
+    print(f"   Word error rate: {show(summary['word_error_rate'], '.1%')}", file=file)
+    print(f"   CPU: {summary['cpu_seconds']:.1f} s, "
+          f"peak RSS: {summary['peak_rss_mb']:.0f} MB", file=file)
+    print("   Stage (median / p95 / max ms):", file=file)
+    for name, numbers in results['stages'].items():
+        print(f"     {name:15s} {numbers['median_ms']:8.1f} / "
+              f"{numbers['p95_ms']:8.1f} / {numbers['max_ms']:8.1f}", file=file)
+    print("=" * 50, file=file)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the voice pipeline on recorded commands")
+    parser.add_argument('manifest', help="JSONL manifest of recordings")
+    parser.add_argument('-m', '--model', default="/home/pi/vosk-model-hindi",
+                        help="path to the Vosk model")
+    parser.add_argument('-o', '--output', help="write the JSON results here (default: stdout)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-tts', action='store_true', help="skip synthesis")
+    parser.add_argument('--model-server', default=None,
+                        help="socket or host:port of a running model_server.py")
+    parser.add_argument('--trace', metavar='FILE', help="per-utterance JSONL traces")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="earlier results to compare against")
+    args = parser.parse_args()
+
+    entries = read_manifest(args.manifest)
+    if not entries:
+        parser.error("manifest is empty")
+
+    results = run_benchmark(entries, args.model, seed=args.seed,
+                            tts=not args.no_tts, model_server=args.model_server,
+                            trace_path=args.trace)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    print_summary(results)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        print(f"\n📊 Compared with {baseline['meta'].get('revision')}:", file=sys.stderr)
+        regressed = False
+        for metric, old, new, change, worse in compare_results(baseline, results):
+            flag = "❌" if worse else "  "
+            print(f"   {flag} {metric:16s} {old:10.4f} → {new:10.4f} ({change:+.1%})",
+                  file=sys.stderr)
+            regressed |= worse
+        return 1 if regressed else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
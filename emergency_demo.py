@@ -14,6 +14,8 @@ import time
 from datetime import datetime
 import random
 
+from tracing import Tracer
+
 class EmergencyDemo:
     """Simplified demo for submission"""
     
@@ -126,18 +128,23 @@ class EmergencyDemo:
             "धन्यवाद"
         ]
         
+        tracer = Tracer()
+        
         for i, command in enumerate(test_commands, 1):
             print(f"Test {i}/{len(test_commands)}")
             print(f"👤 Command: {command}")
             
-            start_time = time.time()
-            response = self.process_command(command)
-            end_time = time.time()
+            trace = tracer.start()
+            with trace.span('intent'):
+                response = self.process_command(command)
             
+            trace.mark('first_audio')
             self.speak(response)
+            trace.mark('playback_end')
+            tracer.finish(trace, command=command)
             
-            response_time = end_time - start_time
-            print(f"⏱️  Response Time: {response_time:.2f}s")
+            print(f"⏱️  Intent: {trace.durations['intent'] / 1e6:.2f} ms, "
+                  f"spoken in {trace.marks['playback_end'] / 1e9:.2f}s")
             print("-" * 60)
             print()
             
@@ -148,7 +155,7 @@ class EmergencyDemo:
         print("Statistics:")
         print(f"  Total Commands: {len(test_commands)}")
         print(f"  Success Rate: 100%")
-        print(f"  Avg Response Time: < 1s")
+        tracer.print_summary()
         print()
     
     def run_interactive(self):
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Matcher Module - Intent matching that tolerates ASR mistakes
+Second stage after the exact pattern matcher
+
+This module:
+- Splits Devanagari text into aksharas (consonant clusters with signs)
+- Scores a vowel sign or a similar consonant (त/द, म/न) as half an edit,
+  so one-akshara confusions like 'मदत' / 'मदद' still count as close
+- Indexes normalized patterns by the deletion neighbours of their
+  consonant skeletons, so matching an utterance is a bounded number of
+  dictionary lookups instead of a search that has to be cut off in time
+"""
+
+import unicodedata
+
+VIRAMA = '\u094d'
+
+# Consonants ASR confuses with each other: same place of articulation
+# (voicing, aspiration), the nasals and the sibilants
+SIMILAR_CONSONANTS = ('कखगघ', 'चछजझ', 'टठडढ', 'तथदध', 'पफबभ', 'ङञणनम', 'शषस')
+# Independent vowels that differ only in length or quality
+SIMILAR_VOWELS = ('अआ', 'इई', 'उऊ', 'एऐ', 'ओऔ')
+_GROUP = {char: group[0] for group in SIMILAR_CONSONANTS + SIMILAR_VOWELS
+          for char in group}
+
+# Cost of replacing an akshara with a similar one (other edits cost 1)
+SIMILAR_COST = 0.5
+
+
+def split_aksharas(text):
+    """
+    Split text into aksharas
+
+    A new akshara starts at every base character, except right after a
+    virama (which joins consonants into a cluster). Vowel signs, nukta,
+    anusvara etc. stay attached to their base.
+
+    Args:
+        text (str): Normalized text
+
+    Returns:
+        tuple: Aksharas (spaces are kept as their own unit)
+    """
+    aksharas = []
+    for char in text:
+        joins = (aksharas
+                 and (unicodedata.category(char) in ('Mn', 'Mc')
+                      or aksharas[-1].endswith(VIRAMA)))
+        if joins:
+            aksharas[-1] += char
+        else:
+            aksharas.append(char)
+    return tuple(aksharas)
+
+
+def akshara_key(akshara):
+    """
+    Consonant skeleton of an akshara
+
+    Drops vowel signs, virama and anusvara and replaces each letter with
+    the first of its similarity group, so 'री', 'रि' and 'र' share a key,
+    as do 'द' and 'त'.
+
+    Args:
+        akshara (str): One akshara
+
+    Returns:
+        str: Its key
+    """
+    return ''.join(_GROUP.get(char, char) for char in akshara
+                   if unicodedata.category(char) not in ('Mn', 'Mc'))
+
+
+def edit_distance(a, b, limit=None):
+    """
+    Levenshtein distance between two sequences
+
+    Args:
+        a, b (sequence): Sequences to compare
+        limit (int): Stop early and return limit + 1 once the distance
+                     is known to exceed it
+
+    Returns:
+        int: Edit distance
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, item_a in enumerate(a, 1):
+        current = [i]
+        for j, item_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (item_a != item_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+
+    return previous[-1]
+
+
+def akshara_distance(a, b, keys_a, keys_b, limit):
+    """
+    Edit distance between akshara sequences, with similar aksharas
+    (same key) costing SIMILAR_COST to substitute
+
+    Args:
+        a, b (tuple): Akshara sequences
+        keys_a, keys_b (tuple): Their akshara_key()s
+        limit (float): Stop early and return limit + 1 once the distance
+                       is known to exceed it
+
+    Returns:
+        float: Weighted edit distance
+    """
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [float(i)]
+        for j in range(1, len(b) + 1):
+            if a[i - 1] == b[j - 1]:
+                cost = 0.0
+            elif keys_a[i - 1] == keys_b[j - 1]:
+                cost = SIMILAR_COST
+            else:
+                cost = 1.0
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + cost))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+
+    return previous[-1]
+
+
+def deletion_neighbours(keys, depth):
+    """
+    All sequences left after deleting up to depth items
+
+    Two sequences within Levenshtein distance depth of each other always
+    share one of these, which is what makes the index below complete.
+
+    Args:
+        keys (tuple): Sequence
+        depth (int): Most deletions
+
+    Returns:
+        set: Tuples, including keys itself
+    """
+    neighbours = {keys}
+    frontier = {keys}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:]
+                    for variant in frontier for i in range(len(variant))}
+        neighbours |= frontier
+    return neighbours
+
+
+class FuzzyMatcher:
+    """
+    Approximate intent matching over normalized patterns
+    """
+
+    # Deletions indexed per pattern; queries use max_distance() of the span
+    INDEX_DEPTH = 2
+
+    def __init__(self, min_score=0.6, min_aksharas=3,
+                 short_aksharas=3, short_min_score=0.8):
+        """
+        Args:
+            min_score (float): Minimum similarity (0-1) to accept a match
+            min_aksharas (int): Shorter patterns are only matched exactly,
+                                since one edit changes them completely
+            short_aksharas (int): Patterns up to this length need
+                                  short_min_score instead, since everyday
+                                  words are often one edit away from them
+            short_min_score (float): Minimum similarity for short patterns
+        """
+        self.min_score = min_score
+        self.min_aksharas = min_aksharas
+        self.short_aksharas = short_aksharas
+        self.short_min_score = short_min_score
+
+        # deletion neighbour of a skeleton -> [(aksharas, keys, value)]
+        self.index = {}
+        # Longest pattern, in words and in aksharas: bounds the spans tried
+        self.max_words = 0
+        self.max_aksharas = 0
+
+        # Statistics
+        self.queries = 0
+        self.lookups = 0
+
+    def add(self, pattern, value):
+        """
+        Index a normalized pattern
+
+        Args:
+            pattern (str): Normalized pattern text
+            value: Returned on a match (e.g. intent name)
+        """
+        aksharas = split_aksharas(pattern)
+        if len(aksharas) < self.min_aksharas:
+            return
+
+        keys = tuple(akshara_key(akshara) for akshara in aksharas)
+        entry = (aksharas, keys, value)
+        for neighbour in deletion_neighbours(keys, self.INDEX_DEPTH):
+            self.index.setdefault(neighbour, []).append(entry)
+
+        self.max_words = max(self.max_words, pattern.count(' ') + 1)
+        self.max_aksharas = max(self.max_aksharas, len(aksharas))
+
+    @staticmethod
+    def max_distance(length):
+        """Edits allowed for a word span of the given akshara length"""
+        return 1 if length <= 5 else 2
+
+    def match(self, text):
+        """
+        Find the closest pattern to any word span of the text
+
+        Spans are capped at the longest pattern (words and aksharas), and
+        each one costs at most a few dozen index lookups, so the work
+        grows linearly with the utterance and needs no time limit.
+
+        Args:
+            text (str): Normalized utterance
+
+        Returns:
+            tuple: (value, score) of the best match, or (None, 0.0)
+        """
+        self.queries += 1
+
+        words = [split_aksharas(token) for token in text.split()]
+        word_keys = [tuple(akshara_key(akshara) for akshara in word) for word in words]
+        longest = self.max_aksharas + self.INDEX_DEPTH
+
+        best_value = None
+        best_score = 0.0
+
+        for start in range(len(words)):
+            span, keys = (), ()
+            for end in range(start, min(len(words), start + self.max_words)):
+                if span:
+                    span += (' ',)
+                    keys += (' ',)
+                span += words[end]
+                keys += word_keys[end]
+                if len(span) > longest:
+                    break
+                if len(span) < self.min_aksharas - 1:
+                    continue
+
+                limit = self.max_distance(len(span))
+                candidates = {}
+                for neighbour in deletion_neighbours(keys, limit):
+                    self.lookups += 1
+                    for entry in self.index.get(neighbour, ()):
+                        candidates[entry[0]] = entry
+
+                for aksharas, pattern_keys, value in candidates.values():
+                    distance = akshara_distance(span, aksharas, keys, pattern_keys, limit)
+                    if distance > limit:
+                        continue
+                    score = 1.0 - distance / max(len(aksharas), len(span))
+                    if len(aksharas) <= self.short_aksharas and score < self.short_min_score:
+                        continue
+                    if score > best_score:
+                        best_score = score
+                        best_value = value
+
+        return self._result(best_value, best_score)
+
+    def _result(self, value, score):
+        """Apply the score threshold"""
+        if value is None or score < self.min_score:
+            return None, 0.0
+        return value, score
+
+
+def test_fuzzy_matcher():
+    """
+    Test one-akshara ASR confusions against the assistant's patterns
+    Run: python3 fuzzy_matcher.py
+    """
+    from intent_handler import IntentHandler
+    from text_normalizer import normalize_text
+
+    print("\n📝 Test: fuzzy intent matching")
+
+    handler = IntentHandler()
+    near_misses = [
+        ('मौसन कैसा है', 'weather'),
+        ('तारिख बताओ', 'date'),
+        ('मदत करो', 'help'),
+        ('बेटरी कितनी है', 'battery'),
+    ]
+    for text, expected in near_misses:
+        intent, response = handler.process(text)
+        assert intent == expected, f"'{text}': {intent}, expected {expected}"
+        print(f"   ✅ '{text}' -> {intent} ({handler.last_match_score:.2f})")
+
+    # The matcher itself catches a misheard reboot too; IntentHandler keeps
+    # 'reboot' out of the fuzzy stage so that it needs the exact word
+    matcher = FuzzyMatcher()
+    matcher.add(normalize_text('रीबूट'), 'reboot')
+    assert matcher.match(normalize_text('रीबुट करो'))[0] == 'reboot'
+    assert handler.process('रीबुट करो')[0] == 'unknown'
+    print("   ✅ 'रीबुट करो' -> reboot (matcher only)")
+
+    # Everyday words one edit from a short pattern must not match
+    for text in ('मैं बाजार जा रहा हूं', 'पहर', 'समर', 'मुझे समझ नहीं आया'):
+        intent, response = handler.process(text)
+        assert intent == 'unknown', f"'{text}': {intent}"
+        print(f"   ✅ '{text}' -> unknown")
+
+
+if __name__ == "__main__":
+    # Run test when this file is executed directly
+    test_fuzzy_matcher()
@@ -15,6 +15,13 @@ from datetime import datetime
 import random
 import subprocess
 
+from fuzzy_matcher import FuzzyMatcher
+from pattern_matcher import PatternMatcher
+from text_normalizer import normalize_text
+
+# Spoken when the assistant starts
+WELCOME_MESSAGE = "नमस्ते! मैं आपकी हिंदी सहायक हूं।"
+
 class IntentHandler:
     """
     Handles intent recognition and command execution
@@ -84,11 +91,91 @@ class IntentHandler:
             },
         }
         
+        # Fixed response texts. Kept here (not inside the action methods)
+        # so the TTS can pre-render all of them, see get_static_responses()
+        self.responses = {
+            'no_input': ['मुझे कुछ सुनाई नहीं दिया'],
+            'welcome': [WELCOME_MESSAGE],
+            'greeting': [
+                'नमस्ते! मैं आपकी कैसे मदद कर सकता हूं?',
+                'हैलो! मुझे बताएं मैं क्या कर सकता हूं?',
+                'प्रणाम! आपके लिए क्या करूं?'
+            ],
+            'thanks': [
+                'आपका स्वागत है!',
+                'कोई बात नहीं!',
+                'खुशी हुई मदद करके!'
+            ],
+            'exit': ['अच्छा, नमस्ते! फिर मिलेंगे!'],
+            'weather': [
+                'मौसम सुहावना है आज',
+                'आज धूप है',
+                'थोड़ी बदली है आज',
+                'मैं ऑफलाइन हूं, असली मौसम नहीं बता सकता'
+            ],
+            'battery_unknown': ['बैटरी की जानकारी नहीं मिली'],
+            'no_battery': ['यह डिवाइस बैटरी पर नहीं चल रहा'],
+            'volume_up': ['वॉल्यूम बढ़ाया गया'],
+            'volume_down': ['वॉल्यूम घटाया गया'],
+            'volume_error': ['वॉल्यूम नहीं बदल सका'],
+            'joke': [
+                'एक चूहा बोला दूसरे चूहे से, मैं प्रोग्रामर बनूंगा। दूसरा बोला क्यों? पहला बोला, चीज़ खाने के लिए!',
+                'टीचर ने पूछा, पाई का मान क्या है? छात्र बोला, तीन पॉइंट वन फोर... टीचर बोला, पूरा बोलो! छात्र बोला, यही काफी है सर, पूरा पाई खाने से मोटा हो जाऊंगा!',
+                'कंप्यूटर ने मोबाइल से पूछा, तुम इतने पतले कैसे हो? मोबाइल बोला, मैं रोज़ चार्ज होता हूं!'
+            ],
+            'help': ['मैं ये काम कर सकता हूं: समय बताओ, तारीख बताओ, मौसम बताओ, मज़ाक सुनाओ, वॉल्यूम बदलो'],
+            'identity': ['मैं एक हिंदी आवाज़ सहायक हूं। मैं रास्पबेरी पाई पर चलता हूं और पूरी तरह ऑफलाइन हूं।'],
+            'calculate': ['मैं अभी सिर्फ आसान गणना कर सकता हूं'],
+            'reboot': ['रीबूट करने के लिए मुझे और अधिकार चाहिए'],
+            'unknown': [
+                'मुझे समझ नहीं आया। कृपया फिर से कहें।',
+                'यह कमांड मुझे नहीं पता। मदद के लिए "मदद करो" कहें।',
+                'मैं यह नहीं कर सकता। कुछ और पूछें।'
+            ],
+        }
+        
+        # Dynamic responses, built from fixed words and slot values. The
+        # TTS renders these from cached fragments (see get_response_templates)
+        self.templates = {
+            'time': 'अभी {hour} बजकर {minute} मिनट {period} के हैं',
+            'date': 'आज {weekday} है, {day} {month} {year}',
+        }
+        
+        # Hindi months
+        self.months_hindi = [
+            'जनवरी', 'फरवरी', 'मार्च', 'अप्रैल', 'मई', 'जून',
+            'जुलाई', 'अगस्त', 'सितंबर', 'अक्टूबर', 'नवंबर', 'दिसंबर'
+        ]
+        
+        # Hindi days
+        self.days_hindi = [
+            'सोमवार', 'मंगलवार', 'बुधवार', 'गुरुवार', 
+            'शुक्रवार', 'शनिवार', 'रविवार'
+        ]
+        
+        # Common words spoken around commands ("समय बताओ", "मौसम कैसा है").
+        # Added to the ASR grammar so command mode can still decode them.
+        self.filler_words = [
+            'बताओ', 'बताइए', 'सुनाओ', 'करो', 'क्या', 'है', 'हैं',
+            'कैसा', 'कितना', 'कितने', 'हो', 'आज', 'अभी', 'मुझे', 'तुम', 'आप'
+        ]
+        
+        # Intents that must hear the whole utterance before acting, because
+        # the important part comes after the pattern ("दो जोड़ तीन") or a
+        # premature trigger would be costly
+        self.no_early_dispatch = {'exit', 'reboot', 'calculate'}
+        
         # Statistics
         self.command_count = {}
         for cmd in self.commands.keys():
             self.command_count[cmd] = 0
         
+        # Similarity (0-1) of the last match; below 1.0 means fuzzy
+        self.last_match_score = 0.0
+        
+        # Compile all patterns into one automaton
+        self.build_matcher()
+        
         print(f"   ✅ Loaded {len(self.commands)} command categories")
     
     def process(self, text):
@@ -103,56 +190,147 @@ class IntentHandler:
         """
         
         if not text:
-            return 'no_input', 'मुझे कुछ सुनाई नहीं दिया'
+            return 'no_input', self.responses['no_input'][0]
+        
+        # Normalize once (case, nukta, nasal spellings, punctuation)
+        text_norm = normalize_text(text)
         
-        # Convert to lowercase for matching
-        text_lower = text.lower().strip()
+        # Try to match intent (exact first, then tolerant of ASR errors)
+        intent = self._match_intent(text_norm)
+        self.last_match_score = 1.0 if intent else 0.0
         
-        # Try to match intent
-        intent = self._match_intent(text_lower)
+        if not intent:
+            intent, self.last_match_score = self.fuzzy_matcher.match(text_norm)
         
         if intent:
             # Update statistics
             self.command_count[intent] += 1
             
             # Execute the action
-            response = self.commands[intent]['action'](text_lower)
+            response = self.commands[intent]['action'](text_norm)
             return intent, response
         else:
             # Unknown command
-            return 'unknown', self._handle_unknown(text_lower)
+            return 'unknown', self._handle_unknown(text_norm)
+    
+    def build_matcher(self):
+        """
+        Compile every command pattern into the multi-pattern matcher
+        
+        Patterns are normalized here once, so spelling variants such as
+        'मज़ाक' / 'मजाक' don't need to be listed separately. Call again
+        after adding or changing entries in self.commands.
+        """
+        self.matcher = PatternMatcher()
+        self.fuzzy_matcher = FuzzyMatcher()
+        for intent_name, intent_data in self.commands.items():
+            for pattern in intent_data['patterns']:
+                pattern = normalize_text(pattern)
+                self.matcher.add(pattern, intent_name)
+                # A near miss must never quit, reboot or calculate
+                if intent_name not in self.no_early_dispatch:
+                    self.fuzzy_matcher.add(pattern, intent_name)
+        self.matcher.build()
+        
+        for intent_name in self.commands:
+            self.command_count.setdefault(intent_name, 0)
     
     def _match_intent(self, text):
         """
         Match input text to an intent using pattern matching
         
+        All patterns are searched in one pass. When several match, the
+        longest (most specific) pattern wins.
+        
         Args:
-            text (str): Input text
+            text (str): Normalized input text (see normalize_text)
             
         Returns:
             str: Intent name or None
         """
+        return self.matcher.best(text)
+    
+    def match_early(self, text):
+        """
+        Check whether a partial ASR result already identifies the command
         
-        # Check each command's patterns
-        for intent_name, intent_data in self.commands.items():
-            patterns = intent_data['patterns']
+        Used for early dispatch while the user is still speaking, so it
+        only answers when exactly one intent matches and that intent is
+        safe to trigger early.
+        
+        Args:
+            text (str): Partial recognized text
             
-            for pattern in patterns:
-                if pattern in text:
-                    return intent_name
+        Returns:
+            str: Intent name, or None if no match, ambiguous or unsafe
+        """
+        if not text:
+            return None
         
-        return None
+        candidates = self.matcher.values(normalize_text(text))
+        
+        if len(candidates) != 1:
+            return None
+        
+        intent = candidates.pop()
+        if intent in self.no_early_dispatch:
+            return None
+        return intent
+    
+    def get_static_responses(self):
+        """
+        Every fixed response text the assistant can say (actions and welcome)
+        
+        Dynamic answers (time, date, battery level) are not included.
+        
+        Returns:
+            list: Unique response strings
+        """
+        phrases = []
+        for texts in self.responses.values():
+            phrases.extend(texts)
+        return list(dict.fromkeys(phrases))
+    
+    def get_response_templates(self):
+        """
+        Templates of the dynamic responses with their known slot values
+        
+        Slots without a list (the year) are rendered when first needed.
+        
+        Returns:
+            list: (format string, {slot name: list of values}) tuples
+        """
+        numbers = [str(n) for n in range(60)]
+        slots = {
+            'hour': numbers[1:13],
+            'minute': numbers,
+            'period': ['रात', 'सुबह', 'दोपहर', 'शाम'],
+            'weekday': self.days_hindi,
+            'day': numbers[1:32],
+            'month': self.months_hindi,
+        }
+        return [(template, slots) for template in self.templates.values()]
+    
+    def get_grammar_phrases(self):
+        """
+        Phrases for grammar-restricted (command mode) speech recognition
+        
+        Returns:
+            list: Every registered pattern plus the filler words
+        """
+        phrases = []
+        for intent_data in self.commands.values():
+            phrases.extend(intent_data['patterns'])
+        phrases.extend(self.filler_words)
+        
+        # Keep order stable but drop duplicates
+        return list(dict.fromkeys(phrases))
     
     # ==================== ACTION FUNCTIONS ====================
     
     def _greet(self, text):
         """Respond to greeting"""
-        responses = [
-            'नमस्ते! मैं आपकी कैसे मदद कर सकता हूं?',
-            'हैलो! मुझे बताएं मैं क्या कर सकता हूं?',
-            'प्रणाम! आपके लिए क्या करूं?'
-        ]
-        return random.choice(responses)
+        return random.choice(self.responses['greeting'])
     
     def _tell_time(self, text):
         """Tell current time"""
@@ -174,55 +352,34 @@ class IntentHandler:
             hour_12 = hour - 12
             period = 'शाम'
         
-        return f'अभी {hour_12} बजकर {minute} मिनट {period} के हैं'
+        return self.templates['time'].format(hour=hour_12, minute=minute,
+                                             period=period)
     
     def _tell_date(self, text):
         """Tell current date"""
         now = datetime.now()
         
-        # Hindi months
-        months_hindi = [
-            'जनवरी', 'फरवरी', 'मार्च', 'अप्रैल', 'मई', 'जून',
-            'जुलाई', 'अगस्त', 'सितंबर', 'अक्टूबर', 'नवंबर', 'दिसंबर'
-        ]
-        
-        # Hindi days
-        days_hindi = [
-            'सोमवार', 'मंगलवार', 'बुधवार', 'गुरुवार', 
-            'शुक्रवार', 'शनिवार', 'रविवार'
-        ]
-        
         day = now.day
-        month = months_hindi[now.month - 1]
+        month = self.months_hindi[now.month - 1]
         year = now.year
-        weekday = days_hindi[now.weekday()]
+        weekday = self.days_hindi[now.weekday()]
         
-        return f'आज {weekday} है, {day} {month} {year}'
+        return self.templates['date'].format(weekday=weekday, day=day,
+                                             month=month, year=year)
     
     def _respond_thanks(self, text):
         """Respond to thanks"""
-        responses = [
-            'आपका स्वागत है!',
-            'कोई बात नहीं!',
-            'खुशी हुई मदद करके!'
-        ]
-        return random.choice(responses)
+        return random.choice(self.responses['thanks'])
     
     def _exit(self, text):
         """Handle exit command"""
-        return 'अच्छा, नमस्ते! फिर मिलेंगे!'
+        return self.responses['exit'][0]
     
     def _tell_weather(self, text):
         """Tell weather (offline - simulated data)"""
         # Since we're offline, we can't get real weather
         # Provide simulated response
-        responses = [
-            'मौसम सुहावना है आज',
-            'आज धूप है',
-            'थोड़ी बदली है आज',
-            'मैं ऑफलाइन हूं, असली मौसम नहीं बता सकता'
-        ]
-        return random.choice(responses)
+        return random.choice(self.responses['weather'])
     
     def _check_battery(self, text):
         """Check battery status (for laptop Pi setups)"""
@@ -239,44 +396,39 @@ class IntentHandler:
                 battery = result.stdout.strip()
                 return f'बैटरी {battery} प्रतिशत है'
             else:
-                return 'बैटरी की जानकारी नहीं मिली'
+                return self.responses['battery_unknown'][0]
         except:
-            return 'यह डिवाइस बैटरी पर नहीं चल रहा'
+            return self.responses['no_battery'][0]
     
     def _volume_up(self, text):
         """Increase volume"""
         try:
             subprocess.run(['amixer', 'set', 'Master', '10%+'], 
                          capture_output=True, timeout=2)
-            return 'वॉल्यूम बढ़ाया गया'
+            return self.responses['volume_up'][0]
         except:
-            return 'वॉल्यूम नहीं बदल सका'
+            return self.responses['volume_error'][0]
     
     def _volume_down(self, text):
         """Decrease volume"""
         try:
             subprocess.run(['amixer', 'set', 'Master', '10%-'], 
                          capture_output=True, timeout=2)
-            return 'वॉल्यूम घटाया गया'
+            return self.responses['volume_down'][0]
         except:
-            return 'वॉल्यूम नहीं बदल सका'
+            return self.responses['volume_error'][0]
     
     def _tell_joke(self, text):
         """Tell a Hindi joke"""
-        jokes = [
-            'एक चूहा बोला दूसरे चूहे से, मैं प्रोग्रामर बनूंगा। दूसरा बोला क्यों? पहला बोला, चीज़ खाने के लिए!',
-            'टीचर ने पूछा, पाई का मान क्या है? छात्र बोला, तीन पॉइंट वन फोर... टीचर बोला, पूरा बोलो! छात्र बोला, यही काफी है सर, पूरा पाई खाने से मोटा हो जाऊंगा!',
-            'कंप्यूटर ने मोबाइल से पूछा, तुम इतने पतले कैसे हो? मोबाइल बोला, मैं रोज़ चार्ज होता हूं!'
-        ]
-        return random.choice(jokes)
+        return random.choice(self.responses['joke'])
     
     def _help(self, text):
         """List available commands"""
-        return 'मैं ये काम कर सकता हूं: समय बताओ, तारीख बताओ, मौसम बताओ, मज़ाक सुनाओ, वॉल्यूम बदलो'
+        return self.responses['help'][0]
     
     def _tell_identity(self, text):
         """Tell who the assistant is"""
-        return 'मैं एक हिंदी आवाज़ सहायक हूं। मैं रास्पबेरी पाई पर चलता हूं और पूरी तरह ऑफलाइन हूं।'
+        return self.responses['identity'][0]
     
     def _calculate(self, text):
         """Simple calculation (basic example)"""
@@ -289,24 +441,19 @@ class IntentHandler:
         }
         
         # Simple extraction (this is basic - improve as needed)
-        result = 'मैं अभी सिर्फ आसान गणना कर सकता हूं'
+        result = self.responses['calculate'][0]
         
         return result
     
     def _reboot(self, text):
         """Reboot system (use carefully!)"""
-        return 'रीबूट करने के लिए मुझे और अधिकार चाहिए'
+        return self.responses['reboot'][0]
         # Uncomment below for actual reboot (dangerous!)
         # subprocess.run(['sudo', 'reboot'])
     
     def _handle_unknown(self, text):
         """Handle unknown commands"""
-        responses = [
-            'मुझे समझ नहीं आया। कृपया फिर से कहें।',
-            'यह कमांड मुझे नहीं पता। मदद के लिए "मदद करो" कहें।',
-            'मैं यह नहीं कर सकता। कुछ और पूछें।'
-        ]
-        return random.choice(responses)
+        return random.choice(self.responses['unknown'])
     
     def get_statistics(self):
         """Get command usage statistics"""
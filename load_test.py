@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Load Test - How many microphones one model server keeps up with
+Streams a recording from many simulated clients at once, in real time
+
+This module:
+- Opens N concurrent streams to a running model_server.py (Unix socket
+  or TCP) and sends each one audio chunk by chunk, paced like a
+  microphone, reading back the partial and final results
+- Measures the reply latency of every chunk and how far each stream
+  falls behind real time by the end
+- Ramps the number of streams up until the server can no longer keep
+  all of them within the allowed lag; the last passing step is the
+  number of rooms the box can serve
+
+Usage:
+    python3 model_server.py --socket 127.0.0.1:2700 &
+    python3 load_test.py command.wav --server 127.0.0.1:2700
+    python3 load_test.py command.wav --streams 1,2,4,8 -o load.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+from audio_source import WavFileSource
+from model_server import DEFAULT_SOCKET, RemoteModel, RemoteRecognizer
+
+
+def _percentile(ordered, fraction):
+    """Value at a fraction of a sorted list"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def load_recording(path, seconds):
+    """
+    Read a recording and loop it to the wanted length
+
+    Args:
+        path (str): WAV or raw 16-bit mono PCM file
+        seconds (float): Audio length each stream sends
+
+    Returns:
+        tuple: (PCM bytes, sample rate)
+    """
+    source = WavFileSource(path)
+    chunks = []
+    while True:
+        data = source.read(16000)
+        if not data:
+            break
+        chunks.append(data)
+    source.close()
+
+    pcm = b''.join(chunks)
+    if not pcm:
+        raise ValueError(f"{path}: no audio")
+
+    needed = int(seconds * source.sample_rate) * 2
+    repeats = -(-needed // len(pcm))
+    return (pcm * repeats)[:needed], source.sample_rate
+
+
+def run_stream(address, pcm, sample_rate, chunk_ms, start_at, result):
+    """
+    One simulated microphone (runs on its own thread)
+
+    Args:
+        address (str): Model server socket or host:port
+        pcm (bytes): Audio to send
+        sample_rate (int): Its sample rate
+        chunk_ms (int): Audio per message
+        start_at (float): time.monotonic() to start streaming at
+        result (dict): Filled with latencies, lag and result counts
+    """
+    chunk_bytes = int(sample_rate * chunk_ms / 1000) * 2
+    chunk_seconds = chunk_bytes / 2 / sample_rate
+    latencies = []
+    finals = 0
+    partials = 0
+
+    try:
+        recognizer = RemoteRecognizer(address, sample_rate)
+
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        start = time.monotonic()
+
+        for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+            # A microphone delivers a chunk once it has been captured
+            delay = start + (index + 1) * chunk_seconds - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            sent = time.monotonic()
+            reply = recognizer.stream(pcm[offset:offset + chunk_bytes])
+            latencies.append(time.monotonic() - sent)
+
+            if reply.get('final'):
+                finals += 1
+            elif reply.get('partial'):
+                partials += 1
+
+        if json.loads(recognizer.FinalResult()).get('text'):
+            finals += 1
+        recognizer.close()
+
+        # How long after the end of the audio the last result arrived
+        result['lag'] = time.monotonic() - (start + len(pcm) / 2 / sample_rate)
+    except (OSError, RuntimeError) as e:
+        result['error'] = str(e)
+
+    result['latencies'] = latencies
+    result['finals'] = finals
+    result['partials'] = partials
+
+
+def run_load(address, pcm, sample_rate, streams, chunk_ms=100, max_lag=0.5):
+    """
+    Stream to the server from several clients at once
+
+    Args:
+        address (str): Model server socket or host:port
+        pcm (bytes): Audio every stream sends
+        sample_rate (int): Its sample rate
+        streams (int): Concurrent streams
+        chunk_ms (int): Audio per message
+        max_lag (float): Seconds a stream may end behind real time
+                         and still count as keeping up
+
+    Returns:
+        dict: Latency percentiles, lag, server CPU share and whether
+              every stream kept up ('realtime')
+    """
+    server_before = RemoteModel(address).info
+
+    # Spread the streams over one chunk so they don't all send at once
+    first = time.monotonic() + 0.2
+    results = [{} for _ in range(streams)]
+    threads = [
+        threading.Thread(target=run_stream, name=f"stream-{index}",
+                         args=(address, pcm, sample_rate, chunk_ms,
+                               first + index * chunk_ms / 1000 / streams,
+                               results[index]),
+                         daemon=True)
+        for index in range(streams)
+    ]
+
+    wall_start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.monotonic() - wall_start
+
+    server_after = RemoteModel(address).info
+
+    latencies = sorted(latency for r in results for latency in r['latencies'])
+    errors = [r['error'] for r in results if 'error' in r]
+    lags = [r['lag'] for r in results if 'lag' in r]
+    decode_seconds = server_after['decode_seconds'] - server_before['decode_seconds']
+    audio_seconds = streams * len(pcm) / 2 / sample_rate
+
+    return {
+        'streams': streams,
+        'audio_seconds': audio_seconds,
+        'wall_seconds': wall_seconds,
+        'latency_median_ms': _percentile(latencies, 0.5) * 1000 if latencies else None,
+        'latency_p95_ms': _percentile(latencies, 0.95) * 1000 if latencies else None,
+        'max_lag_seconds': max(lags) if lags else None,
+        'decode_rtf': decode_seconds / audio_seconds if audio_seconds else None,
+        # Average number of cores busy decoding
+        'busy_cores': decode_seconds / wall_seconds if wall_seconds else None,
+        'queue_seconds': server_after['queue_seconds'] - server_before['queue_seconds'],
+        'finals': sum(r['finals'] for r in results),
+        'partials': sum(r['partials'] for r in results),
+        'errors': errors,
+        'realtime': not errors and len(lags) == streams and max(lags) <= max_lag,
+    }
+
+
+def find_capacity(address, pcm, sample_rate, steps=(1, 2, 4, 6, 8, 12, 16),
+                  chunk_ms=100, max_lag=0.5):
+    """
+    Add streams step by step until the server falls behind
+
+    Args:
+        steps (iterable): Stream counts to try, in increasing order
+        (others as for run_load)
+
+    Returns:
+        tuple: (most streams kept in real time, list of run_load results)
+    """
+    capacity = 0
+    runs = []
+    for streams in steps:
+        print(f"🔁 {streams} stream(s)...", file=sys.stderr, flush=True)
+        run = run_load(address, pcm, sample_rate, streams, chunk_ms, max_lag)
+        runs.append(run)
+        print_run(run)
+
+        if not run['realtime']:
+            break
+        capacity = streams
+    return capacity, runs
+
+
+def print_run(run, file=sys.stderr):
+    """One line per load level"""
+    def show(value, fmt):
+        return 'n/a' if value is None else format(value, fmt)
+
+    status = "✅" if run['realtime'] else "❌"
+    print(f"   {status} {run['streams']:3d} streams: "
+          f"latency {show(run['latency_median_ms'], '6.1f')} / "
+          f"{show(run['latency_p95_ms'], '6.1f')} ms, "
+          f"lag {show(run['max_lag_seconds'], '5.2f')} s, "
+          f"cores busy {show(run['busy_cores'], '4.2f')}", file=file)
+    for error in run['errors'][:3]:
+        print(f"      ⚠️  {error}", file=file)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Find how many concurrent real-time streams a model server sustains")
+    parser.add_argument('recording', help="WAV or raw PCM file every stream sends")
+    parser.add_argument('--server', default=DEFAULT_SOCKET,
+                        help=f"model server socket or host:port (default: {DEFAULT_SOCKET})")
+    parser.add_argument('--streams', default="1,2,4,6,8,12,16",
+                        help="stream counts to try, comma separated")
+    parser.add_argument('--seconds', type=float, default=30.0,
+                        help="audio per stream (the recording is looped)")
+    parser.add_argument('--chunk-ms', type=int, default=100, help="audio per message")
+    parser.add_argument('--max-lag', type=float, default=0.5,
+                        help="seconds behind real time a stream may end")
+    parser.add_argument('-o', '--output', help="write the JSON results here")
+    args = parser.parse_args()
+
+    steps = sorted({int(n) for n in args.streams.split(',') if n.strip()})
+    pcm, sample_rate = load_recording(args.recording, args.seconds)
+
+    try:
+        server = RemoteModel(args.server).info
+    except OSError as e:
+        print(f"❌ No model server at {args.server}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"📡 Server {args.server}: {server['workers']} decoding threads", file=sys.stderr)
+    capacity, runs = find_capacity(args.server, pcm, sample_rate, steps,
+                                   args.chunk_ms, args.max_lag)
+    print(f"\n📊 Real-time capacity: {capacity} concurrent stream(s)", file=sys.stderr)
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'server': args.server,
+            'workers': server['workers'],
+            'recording': args.recording,
+            'seconds': args.seconds,
+            'chunk_ms': args.chunk_ms,
+            'max_lag': args.max_lag,
+        },
+        'capacity': capacity,
+        'runs': runs,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(results, indent=2) + '\n')
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
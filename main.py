@@ -5,17 +5,33 @@ Raspberry Pi 4 - Offline Privacy Preserving System
 
 This is the main entry point for the voice assistant.
 It coordinates ASR, Intent Recognition, and TTS modules.
+
+The modules run as an asyncio pipeline: listening (ASR), intent
+parsing and speaking (TTS) are separate stages connected by bounded
+queues, so the assistant keeps listening while it talks.
+
+The modules are picked from the backend registry (backends.py):
+    python3 main.py                                  # microphone, Vosk, eSpeak-NG
+    python3 main.py --asr replay --input command.wav
+    python3 main.py --asr mock --tts mock            # no hardware needed
 """
 
-import sys
 import time
+
+# Measured before anything else is imported, for the cold start time
+PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import sys
 import json
 from datetime import datetime
 
-# Import our custom modules (we'll create these)
-# from asr_module import SpeechRecognizer
-# from intent_handler import IntentHandler
-# from tts_module import TextToSpeech
+from backends import available_backends, create_backend
+from intent_handler import WELCOME_MESSAGE
+from model_server import DEFAULT_SOCKET
+from tracing import Tracer
 
 class VoiceAssistant:
     """
@@ -23,24 +39,71 @@ class VoiceAssistant:
     Manages the complete pipeline: Listen → Understand → Respond
     """
     
-    def __init__(self):
-        """Initialize the voice assistant with all modules"""
+    # Spoken when the assistant starts
+    WELCOME_MESSAGE = WELCOME_MESSAGE
+    
+    def __init__(self, asr='vosk', intent='rules', tts='espeak', options=None,
+                 cold_start_target=5.0, trace_path=None, wake_word=None):
+        """
+        Initialize the voice assistant with all modules
+        
+        Args:
+            asr (str): ASR backend ('vosk', 'replay', 'mock')
+            intent (str): Intent backend ('rules', 'mock')
+            tts (str): TTS backend ('espeak', 'mock')
+            options (dict): Backend options, e.g. model_path, input_path
+            cold_start_target (float): Seconds from process start to
+                                       listening that we aim to stay under
+            trace_path (str): JSONL file for per-turn stage timings
+            wake_word (str): Only listen for commands after this phrase
+                             (None to treat all speech as commands)
+        """
         print("🚀 Initializing Hindi Voice Assistant...")
         print("=" * 50)
         
         # Configuration
         self.is_running = False
-        self.wake_word = "assistant"  # Optional wake word
-        self.use_wake_word = False    # Set to True to enable
+        self.wake_word = wake_word or "सहायक"  # "assistant"
+        self.use_wake_word = wake_word is not None
+        self.awake_seconds = 8.0  # Follow-up commands need no wake word
+        self._awake_until = 0.0
+        
+        # Pipeline settings
+        self.queue_size = 2     # Items waiting between two stages
+        self.echo_tail = 0.8    # Seconds after speaking when we may still hear ourselves
+        self.echo_guard = False # Only a live microphone hears the speaker
         
         # Performance tracking
         self.response_times = []
         self.command_count = 0
+        self.pipeline_stats = {'echo_dropped': 0, 'backpressure_waits': 0, 'wake_ups': 0}
+        self.tracer = Tracer(trace_path)
+        
+        # Speaking state, used to recognize our own voice (see _is_echo)
+        self._speaking = False
+        self._speech_ended_at = 0.0
+        self._speech_interrupted = False
+        
+        # Cold start (process start → listening)
+        self.cold_start_target = cold_start_target
+        self.cold_start_time = None
+        self.init_times = {}
+        
+        # Initialize modules in parallel - loading the Vosk model takes
+        # seconds, the others load meanwhile
+        selected = {'asr': asr, 'intent': intent, 'tts': tts}
+        with ThreadPoolExecutor(max_workers=len(selected), thread_name_prefix="init") as pool:
+            futures = {kind: pool.submit(self._create_module, kind, name, options or {})
+                       for kind, name in selected.items()}
+            modules = {kind: future.result() for kind, future in futures.items()}
         
-        # Initialize modules (uncomment when modules are ready)
-        # self.asr = SpeechRecognizer()
-        # self.intent_handler = IntentHandler()
-        # self.tts = TextToSpeech()
+        self.asr = modules['asr']
+        self.intent_handler = modules['intent']
+        self.tts = modules['tts']
+        self._connect_modules()
+        
+        for kind, seconds in self.init_times.items():
+            print(f"   {kind} ({selected[kind]}) ready in {seconds:.2f} seconds")
         
         print("✅ Voice Assistant initialized successfully!")
         print("=" * 50)
@@ -53,89 +116,205 @@ class VoiceAssistant:
         print("Speak in Hindi to give commands")
         print("Press Ctrl+C to stop\n")
         
-        # Welcome message
-        self._speak("नमस्ते! मैं आपकी हिंदी सहायक हूं।")
-        
         try:
-            while self.is_running:
-                # Main processing loop
-                self._process_audio()
-                
+            asyncio.run(self._run_pipeline())
         except KeyboardInterrupt:
             print("\n\n🛑 Stopping voice assistant...")
-            self.stop()
+        self.stop()
     
-    def _process_audio(self):
-        """
-        Main processing pipeline:
-        1. Listen for audio
-        2. Convert speech to text (ASR)
-        3. Parse intent
-        4. Execute action
-        5. Generate response (TTS)
-        """
+    def _create_module(self, kind, name, options):
+        """Build one backend and record how long it took (runs on an init thread)"""
+        start = time.perf_counter()
+        module = create_backend(kind, name, **options)
+        self.init_times[kind] = time.perf_counter() - start
+        return module
+    
+    def _connect_modules(self):
+        """Wire up the features that need more than one real module"""
+        # Stop speaking when the user talks over the assistant
+        output = getattr(self.tts, 'player', None)
+        source = getattr(self.asr, 'source', None)
+        self.echo_guard = source is not None and source.is_live
+        if output is not None and self.echo_guard:
+            self.asr.enable_barge_in(output)
         
-        # Start timer for performance measurement
-        start_time = time.time()
+        # Idle mode: only the small wake word grammar runs until it is heard
+        if self.use_wake_word:
+            self.asr.enable_wake_word([self.wake_word])
         
-        # STEP 1: Listen and convert speech to text
-        # recognized_text = self.asr.listen()
-        recognized_text = self._mock_listen()  # Temporary mock
+        # Pre-render fixed responses in the background
+        if hasattr(self.tts, 'prerender') and hasattr(self.intent_handler, 'get_static_responses'):
+            from tts_warmup import warm_up
+            self.warmup = warm_up(self.tts, self.intent_handler, background=True)
+    
+    def _record_cold_start(self):
+        """Report the time from process start until we first listen"""
+        self.cold_start_time = time.perf_counter() - PROCESS_START
+        status = "✅" if self.cold_start_time <= self.cold_start_target else "⚠️ "
+        print(f"{status} Cold start: {self.cold_start_time:.2f} seconds "
+              f"(target {self.cold_start_target:.1f})")
+    
+    async def _run_pipeline(self):
+        """
+        Run the pipeline until stopped:
         
-        if not recognized_text:
-            return  # No speech detected
+            listen (ASR) → utterances → intent → responses → speak (TTS)
         
-        print(f"👂 Heard: {recognized_text}")
+        Vosk and synthesis block, so each runs on its own single-thread
+        executor; the capture thread of the audio source feeds the ASR
+        stage. Queues are bounded: when speaking falls behind, the intent
+        stage waits, then the ASR stage waits, while the microphone keeps
+        filling the ring buffer instead of piling up stale responses.
         
-        # STEP 2: Parse the intent from recognized text
-        # intent, response = self.intent_handler.process(recognized_text)
-        intent, response = self._mock_intent(recognized_text)  # Temporary mock
+        The pipeline ends when the speak stage does: after the exit
+        command, or once a replayed recording has been fully answered
+        (None is passed down the queues as end marker).
+        """
+        utterances = asyncio.Queue(maxsize=self.queue_size)  # (text, heard_at, trace)
+        responses = asyncio.Queue(maxsize=self.queue_size)   # (intent, text, heard_at, trace)
         
-        print(f"🧠 Intent: {intent}")
-        print(f"💬 Response: {response}")
+        asr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr")
+        tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
         
-        # STEP 3: Speak the response
-        # self.tts.speak(response)
-        self._speak(response)
+        # Welcome message
+        await responses.put(('welcome', self.WELCOME_MESSAGE, None, None))
         
-        # Track performance
-        end_time = time.time()
-        response_time = end_time - start_time
-        self.response_times.append(response_time)
-        self.command_count += 1
+        stages = [
+            asyncio.create_task(self._listen_stage(asr_executor, utterances)),
+            asyncio.create_task(self._intent_stage(utterances, responses)),
+            asyncio.create_task(self._speak_stage(tts_executor, responses)),
+        ]
+        speak_stage = stages[-1]
         
-        print(f"⏱️  Response time: {response_time:.2f} seconds")
-        print("-" * 50)
+        try:
+            pending = set(stages)
+            while speak_stage in pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()  # Surface errors from any stage
+        finally:
+            self.is_running = False
+            for task in stages:
+                task.cancel()
+            asr_executor.shutdown(wait=False, cancel_futures=True)
+            tts_executor.shutdown(wait=False, cancel_futures=True)
     
-    def _mock_listen(self):
-        """
-        Temporary mock function for testing
-        Replace this with actual ASR when asr_module.py is ready
-        """
-        # Simulate waiting for speech
-        time.sleep(0.5)
-        
-        # For now, return None (no speech)
-        # In real implementation, this will return recognized Hindi text
-        return None
+    async def _put(self, queue, item):
+        """Put with explicit backpressure: wait (and count it) when the queue is full"""
+        if queue.full():
+            self.pipeline_stats['backpressure_waits'] += 1
+        await queue.put(item)
     
-    def _mock_intent(self, text):
+    def _is_echo(self):
         """
-        Temporary mock function for testing
-        Replace this with actual intent handler when intent_handler.py is ready
+        An utterance that ended while we were speaking, or right after,
+        without interrupting us (barge-in) is our own voice
         """
-        intent = "unknown"
-        response = "मुझे समझ नहीं आया"  # "I don't understand"
+        if not self.echo_guard or self._speech_interrupted:
+            return False
+        return self._speaking or time.time() - self._speech_ended_at < self.echo_tail
+    
+    async def _listen_stage(self, executor, utterances):
+        """STEP 1: Listen and convert speech to text"""
+        loop = asyncio.get_running_loop()
+        early_intent = getattr(self.intent_handler, 'match_early', None)
+        
+        self._record_cold_start()
+        
+        while self.is_running:
+            if self.use_wake_word and time.time() > self._awake_until:
+                print(f"💤 Waiting for wake word \"{self.wake_word}\"...")
+                woke = await loop.run_in_executor(executor, self.asr.wait_for_wake_word)
+                if not woke:
+                    if getattr(self.asr, 'source_exhausted', False):
+                        break
+                    continue
+                self.pipeline_stats['wake_ups'] += 1
+                self._awake_until = time.time() + self.awake_seconds
+                print("🔔 Awake!")
+            
+            # Without a wake word, wait for speech as long as it takes;
+            # awake, only until the follow-up window closes
+            timeout = None
+            if self.use_wake_word:
+                timeout = max(0.5, self._awake_until - time.time())
+            
+            trace = self.tracer.start()
+            recognized_text = await loop.run_in_executor(
+                executor, lambda: self.asr.listen(timeout=timeout, early_intent=early_intent,
+                                                  trace=trace))
+            
+            if not recognized_text:
+                if getattr(self.asr, 'source_exhausted', False):
+                    break  # End of a replayed recording
+                continue  # No speech detected
+            
+            if self._is_echo():
+                self.pipeline_stats['echo_dropped'] += 1
+                continue
+            
+            print(f"👂 Heard: {recognized_text}")
+            self._awake_until = time.time() + self.awake_seconds
+            await self._put(utterances, (recognized_text, time.time(), trace))
         
-        return intent, response
+        await utterances.put(None)
     
-    def _speak(self, text):
-        """
-        Temporary mock function for testing
-        Replace this with actual TTS when tts_module.py is ready
-        """
-        print(f"🔊 Speaking: {text}")
-        # In real implementation, this will use eSpeak-NG to speak
+    async def _intent_stage(self, utterances, responses):
+        """STEP 2: Parse the intent from recognized text (fast, runs on the loop)"""
+        while True:
+            item = await utterances.get()
+            if item is None:
+                await responses.put(None)
+                return
+            recognized_text, heard_at, trace = item
+            
+            with trace.span('intent'):
+                intent, response = self.intent_handler.process(recognized_text)
+            
+            print(f"🧠 Intent: {intent}")
+            print(f"💬 Response: {response}")
+            
+            await self._put(responses, (intent, response, heard_at, trace))
+    
+    async def _speak_stage(self, executor, responses):
+        """STEP 3: Speak the responses in order"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            intent, response, heard_at, trace = item
+            
+            self._speaking = True
+            self._speech_interrupted = False
+            try:
+                completed = await loop.run_in_executor(executor, self.tts.speak, response, trace)
+            finally:
+                self._speaking = False
+                self._speech_ended_at = time.time()
+                # The follow-up window starts once we stop talking
+                self._awake_until = max(self._awake_until,
+                                        self._speech_ended_at + self.awake_seconds)
+            
+            # speak() returns False when the user talked over it
+            self._speech_interrupted = completed is False
+            
+            if trace is not None:
+                trace.mark('playback_end')
+                self.tracer.finish(trace, intent=intent, interrupted=self._speech_interrupted)
+            
+            if heard_at is not None:
+                # Track performance (end of the user's speech → response spoken)
+                response_time = time.time() - heard_at
+                self.response_times.append(response_time)
+                self.command_count += 1
+                
+                print(f"⏱️  Response time: {response_time:.2f} seconds")
+                print("-" * 50)
+            
+            if intent == 'exit':
+                return
     
     def stop(self):
         """Stop the voice assistant and print statistics"""
@@ -144,6 +323,14 @@ class VoiceAssistant:
         print("\n" + "=" * 50)
         print("📊 Session Statistics:")
         print(f"   Total commands processed: {self.command_count}")
+        if self.cold_start_time is not None:
+            print(f"   Cold start: {self.cold_start_time:.2f} seconds")
+        print(f"   Own speech ignored: {self.pipeline_stats['echo_dropped']}")
+        print(f"   Backpressure waits: {self.pipeline_stats['backpressure_waits']}")
+        if self.use_wake_word:
+            print(f"   Wake-ups: {self.pipeline_stats['wake_ups']}")
+        self.tracer.print_summary()
+        self.tracer.close()
         
         if self.response_times:
             avg_time = sum(self.response_times) / len(self.response_times)
@@ -155,6 +342,11 @@ class VoiceAssistant:
             print(f"   Slowest response: {max_time:.2f} seconds")
         
         print("=" * 50)
+        
+        for module in (self.asr, self.tts):
+            if hasattr(module, 'close'):
+                module.close()
+        
         print("👋 Thank you for using Hindi Voice Assistant!")
         print("   धन्यवाद!\n")
 
@@ -162,6 +354,25 @@ class VoiceAssistant:
 def main():
     """Main entry point"""
     
+    parser = argparse.ArgumentParser(description="Hindi Voice Assistant")
+    parser.add_argument('--asr', default='vosk', choices=available_backends('asr'))
+    parser.add_argument('--intent', default='rules', choices=available_backends('intent'))
+    parser.add_argument('--tts', default='espeak', choices=available_backends('tts'))
+    parser.add_argument('--model', default="/home/pi/vosk-model-hindi",
+                        help="Vosk model directory")
+    parser.add_argument('--input', help="recording to replay (--asr replay)")
+    parser.add_argument('--model-server', nargs='?', const=DEFAULT_SOCKET, default=None,
+                        help="use the model kept loaded by model_server.py "
+                             "(optionally its socket or host:port)")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="append per-command stage timings to a JSONL file")
+    parser.add_argument('--wake-word', nargs='?', const="सहायक", default=None,
+                        metavar='PHRASE',
+                        help="idle until the wake phrase is heard (default phrase: सहायक)")
+    parser.add_argument('--cold-start-target', type=float, default=5.0,
+                        help="seconds to listening we aim for (default: 5.0)")
+    args = parser.parse_args()
+    
     # ASCII Art Banner
     print("""
     ╔═══════════════════════════════════════════════╗
@@ -177,7 +388,11 @@ def main():
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     # Create and start the assistant
-    assistant = VoiceAssistant()
+    assistant = VoiceAssistant(asr=args.asr, intent=args.intent, tts=args.tts,
+                               options={'model_path': args.model, 'input_path': args.input,
+                                        'model_server': args.model_server},
+                               cold_start_target=args.cold_start_target,
+                               trace_path=args.trace, wake_word=args.wake_word)
     assistant.start()
 
 
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Model Server - Keeps the Vosk Hindi model loaded in a resident process
+Front-end processes attach over a local Unix socket instead of loading
+the model themselves, so restarting the assistant takes well under a second
+
+The server can also listen on TCP, so one box serves the microphones of
+several rooms: every connection is an audio stream with its own
+recognizer, all sharing the one loaded model.
+
+This module:
+- ModelServer: loads the model once, runs one recognizer per client
+  connection, decodes on a pool of worker threads (one per core by
+  default) and keeps the model files hot in the page cache
+- RemoteModel / RemoteRecognizer: client side, used by SpeechRecognizer
+  in place of vosk.Model / KaldiRecognizer (same method names)
+
+Protocol (all integers big-endian):
+    request:  op (1 byte) + payload length (4 bytes) + payload
+    reply:    status b'+' or b'-' (1 byte) + length (4 bytes) + UTF-8 text
+
+    ops: I info, O open recognizer (JSON sample_rate/grammar),
+         A audio, R result, P partial result, F final result, X reset,
+         S stream audio (reply: the final result with "final": true
+           when an utterance ended, the partial result otherwise)
+
+Addresses are Unix socket paths, or host:port for TCP. The TCP port has
+no authentication: bind it to a LAN address, never a public one.
+
+Usage:
+    python3 model_server.py --model /home/pi/vosk-model-hindi
+    python3 main.py --model-server
+
+    python3 model_server.py --socket 192.168.1.20:2700  # serve other rooms
+    python3 main.py --model-server 192.168.1.20:2700
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+import time
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'),
+                              'hindi-voice-assistant-asr.sock')
+
+HEADER = struct.Struct('>cI')
+
+# Largest payload accepted: far above any audio chunk or result, but a
+# bogus length can't make a peer allocate gigabytes
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+
+class MessageTooLargeError(ConnectionError):
+    """A peer announced a message above MAX_MESSAGE_BYTES"""
+
+
+def _receive_exactly(sock, size):
+    """Read size bytes, or return None if the peer closed the connection"""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer += chunk
+    return bytes(buffer)
+
+
+def _receive_message(sock):
+    """
+    Read one framed message: (1-byte tag, payload) or (None, None) at EOF
+
+    Raises:
+        MessageTooLargeError: The length exceeds MAX_MESSAGE_BYTES (the
+                              stream can't be resynchronized, so drop
+                              the connection)
+    """
+    header = _receive_exactly(sock, HEADER.size)
+    if header is None:
+        return None, None
+    tag, length = HEADER.unpack(header)
+    if length > MAX_MESSAGE_BYTES:
+        raise MessageTooLargeError(f"Message of {length} bytes exceeds the "
+                                   f"{MAX_MESSAGE_BYTES} byte limit")
+    payload = _receive_exactly(sock, length) if length else b''
+    if payload is None:
+        return None, None
+    return tag, payload
+
+
+def _send_message(sock, tag, payload):
+    sock.sendall(HEADER.pack(tag, len(payload)) + payload)
+
+
+def parse_address(address):
+    """
+    Tell Unix socket paths from TCP addresses
+
+    Args:
+        address (str): Socket path, or host:port
+
+    Returns:
+        tuple: (address family, path or (host, port))
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and '/' not in address and port.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def _connect(address):
+    """Open a client connection to a model server"""
+    family, target = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.connect(target)
+    except OSError:
+        sock.close()
+        raise
+    if family == socket.AF_INET:
+        # Small request/reply messages - don't let Nagle hold them back
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def remove_stale_socket(path):
+    """
+    Delete a socket file left behind by a crashed server
+
+    Args:
+        path (str): Unix socket path
+
+    Raises:
+        RuntimeError: When the path is not a socket, or a server is
+                      still listening on it
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{path} exists and is not a socket")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)  # Nobody is listening any more
+        return
+    finally:
+        probe.close()
+
+    raise RuntimeError(f"A model server is already listening on {path}")
+
+
+def warm_page_cache(model_path):
+    """
+    Ask the kernel to keep the model files in the page cache
+
+    Args:
+        model_path (str): Model directory
+
+    Returns:
+        int: Bytes of model files covered
+    """
+    total = 0
+    for root, _, files in os.walk(model_path):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                size = os.fstat(fd).st_size
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+                else:
+                    # Reading the file pulls it into the cache as well
+                    while os.read(fd, 1 << 20):
+                        pass
+                total += size
+            finally:
+                os.close(fd)
+    return total
+
+
+class _ClientHandler(socketserver.BaseRequestHandler):
+    """One client connection = one recognizer"""
+
+    def handle(self):
+        from vosk import KaldiRecognizer
+
+        server = self.server.model_server
+        recognizer = None
+        server.count('clients', 1)
+
+        if self.request.family == socket.AF_INET:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        try:
+            while True:
+                op, payload = _receive_message(self.request)
+                if op is None:
+                    return
+
+                try:
+                    if op == b'I':
+                        reply = json.dumps(server.info())
+                    elif op == b'O':
+                        options = json.loads(payload)
+                        grammar = options.get('grammar')
+                        if grammar is not None:
+                            opened = KaldiRecognizer(
+                                server.model, options['sample_rate'],
+                                json.dumps(grammar, ensure_ascii=False))
+                        else:
+                            opened = KaldiRecognizer(server.model, options['sample_rate'])
+                        if recognizer is None:
+                            server.count('streams', 1)
+                        recognizer = opened
+                        reply = '{}'
+                    elif recognizer is None:
+                        raise RuntimeError("No recognizer opened on this connection")
+                    elif op == b'A':
+                        accepted = server.decode(recognizer.AcceptWaveform, payload)
+                        reply = '1' if accepted else '0'
+                        server.count('audio_bytes', len(payload))
+                    elif op == b'S':
+                        server.count('audio_bytes', len(payload))
+                        if server.decode(recognizer.AcceptWaveform, payload):
+                            result = json.loads(recognizer.Result())
+                            result['final'] = True
+                        else:
+                            result = json.loads(recognizer.PartialResult())
+                        reply = json.dumps(result, ensure_ascii=False)
+                    elif op == b'R':
+                        reply = recognizer.Result()
+                    elif op == b'P':
+                        reply = recognizer.PartialResult()
+                    elif op == b'F':
+                        reply = server.decode(recognizer.FinalResult)
+                    elif op == b'X':
+                        recognizer.Reset()
+                        reply = '{}'
+                    else:
+                        raise RuntimeError(f"Unknown operation {op!r}")
+                except Exception as e:
+                    _send_message(self.request, b'-', str(e).encode('utf-8'))
+                    continue
+
+                _send_message(self.request, b'+', reply.encode('utf-8'))
+
+        except MessageTooLargeError as e:
+            print(f"⚠️  Dropped client {self.client_address or 'on Unix socket'}: {e}",
+                  file=sys.stderr)
+        except OSError:
+            pass
+        finally:
+            server.count('clients', -1)
+            if recognizer is not None:
+                server.count('streams', -1)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ModelServer:
+    """
+    Resident process holding the Vosk model for front-end clients
+    """
+
+    def __init__(self, model_path="/home/pi/vosk-model-hindi",
+                 socket_path=DEFAULT_SOCKET, warm_interval=600, workers=None):
+        """
+        Load the model and bind the socket
+
+        Args:
+            model_path (str): Path to the Vosk Hindi model
+            socket_path (str): Unix socket clients connect to, or
+                               host:port to listen on TCP
+            warm_interval (int): Seconds between page cache refreshes
+                                 of the model files (0 to disable)
+            workers (int): Decoding threads shared by all streams
+                           (default: one per CPU core)
+
+        Raises:
+            RuntimeError: When the socket path is taken
+        """
+        from vosk import Model
+
+        self.model_path = model_path
+        self.socket_path = socket_path
+        self.warm_interval = warm_interval
+        self.workers = workers or os.cpu_count() or 1
+
+        # Statistics
+        self.clients = 0    # Open connections
+        self.streams = 0    # Open connections with a recognizer
+        self.audio_bytes = 0
+        self.decode_ns = 0
+        self.queue_ns = 0
+        self.started = time.time()
+        self._stats_lock = threading.Lock()
+
+        # Fail before spending seconds on the model
+        family, address = parse_address(socket_path)
+        if family == socket.AF_UNIX:
+            remove_stale_socket(socket_path)
+
+        print(f"📦 Loading model from: {model_path}")
+        start = time.perf_counter()
+        warm_page_cache(model_path)
+        self.model = Model(model_path)
+        self.load_seconds = time.perf_counter() - start
+        print(f"   ✅ Model loaded in {self.load_seconds:.2f} seconds")
+
+        # Vosk releases the GIL while decoding, so streams decode in
+        # parallel; the pool keeps it to one decoder per core however
+        # many streams are connected
+        self.pool = ThreadPoolExecutor(max_workers=self.workers,
+                                       thread_name_prefix="decoder")
+
+        if family == socket.AF_UNIX:
+            self.server = _UnixServer(address, _ClientHandler)
+        else:
+            self.server = _TCPServer(address, _ClientHandler)
+        self.server.model_server = self
+
+        self._stop = threading.Event()
+
+    def count(self, name, amount):
+        """Update a statistics counter (handlers run on many threads)"""
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def decode(self, function, *args):
+        """
+        Run a decoding call on the worker pool and wait for it
+
+        Args:
+            function: Recognizer method, e.g. AcceptWaveform
+            *args: Its arguments
+        """
+        submitted = time.perf_counter_ns()
+
+        def timed():
+            start = time.perf_counter_ns()
+            try:
+                return function(*args)
+            finally:
+                end = time.perf_counter_ns()
+                with self._stats_lock:
+                    self.queue_ns += start - submitted
+                    self.decode_ns += end - start
+
+        return self.pool.submit(timed).result()
+
+    def info(self):
+        """Server status sent to clients"""
+        return {
+            'model_path': self.model_path,
+            'load_seconds': self.load_seconds,
+            'uptime_seconds': time.time() - self.started,
+            'clients': self.clients,
+            'streams': self.streams,
+            'workers': self.workers,
+            'audio_seconds': self.audio_bytes / 32000,
+            'decode_seconds': self.decode_ns / 1e9,
+            'queue_seconds': self.queue_ns / 1e9,
+        }
+
+    def _keep_warm(self):
+        """Refresh the page cache so a local fallback load stays fast too"""
+        while not self._stop.wait(self.warm_interval):
+            warm_page_cache(self.model_path)
+
+    def serve_forever(self):
+        """Serve clients until interrupted"""
+        if self.warm_interval:
+            threading.Thread(target=self._keep_warm, name="page-cache-warmer",
+                             daemon=True).start()
+
+        print(f"🔌 Listening on {self.socket_path} ({self.workers} decoding threads)")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping model server...")
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
+        self.server.server_close()
+        self.pool.shutdown(wait=False)
+        if self.server.address_family == socket.AF_UNIX and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class RemoteRecognizer:
+    """
+    KaldiRecognizer running in the model server, one connection each
+    """
+
+    def __init__(self, socket_path, sample_rate, grammar=None):
+        self.sock = _connect(socket_path)
+        options = {'sample_rate': sample_rate, 'grammar': grammar}
+        self._call(b'O', json.dumps(options, ensure_ascii=False).encode('utf-8'))
+
+    def _call(self, op, payload=b''):
+        """Send one request and return the reply text"""
+        _send_message(self.sock, op, payload)
+        status, reply = _receive_message(self.sock)
+        if status is None:
+            raise ConnectionError("Model server closed the connection")
+        text = reply.decode('utf-8')
+        if status != b'+':
+            raise RuntimeError(f"Model server error: {text}")
+        return text
+
+    def AcceptWaveform(self, data):
+        return self._call(b'A', bytes(data)) == '1'
+
+    def Result(self):
+        return self._call(b'R')
+
+    def PartialResult(self):
+        return self._call(b'P')
+
+    def FinalResult(self):
+        return self._call(b'F')
+
+    def Reset(self):
+        self._call(b'X')
+
+    def stream(self, data):
+        """
+        Decode audio and get the result in one round trip
+
+        Returns:
+            dict: Final result with 'final': True when an utterance
+                  ended, otherwise the partial result
+        """
+        return json.loads(self._call(b'S', bytes(data)))
+
+    def close(self):
+        self.sock.close()
+
+    def __del__(self):
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class RemoteModel:
+    """
+    Handle to the model loaded in a running ModelServer
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        """
+        Args:
+            socket_path (str): Socket of the model server, or host:port
+
+        Raises:
+            OSError: When no server is listening there
+        """
+        self.socket_path = socket_path
+
+        sock = _connect(socket_path)
+        try:
+            _send_message(sock, b'I', b'')
+            status, reply = _receive_message(sock)
+        finally:
+            sock.close()
+        if status != b'+':
+            raise ConnectionError("Model server did not answer")
+        self.info = json.loads(reply)
+
+    def recognizer(self, sample_rate, grammar=None):
+        """
+        Open a recognizer in the server
+
+        Args:
+            sample_rate (int): Sample rate of the audio
+            grammar (list): Phrases to restrict decoding to, or None
+
+        Returns:
+            RemoteRecognizer: Drop-in for KaldiRecognizer
+        """
+        return RemoteRecognizer(self.socket_path, sample_rate, grammar)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Keep the Vosk model loaded for the voice assistant")
+    parser.add_argument('--model', default="/home/pi/vosk-model-hindi",
+                        help="Vosk model directory")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help=f"Unix socket path, or host:port for TCP "
+                             f"(default: {DEFAULT_SOCKET})")
+    parser.add_argument('--warm-interval', type=int, default=600,
+                        help="seconds between page cache refreshes (0 = off)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="decoding threads (default: one per CPU core)")
+    args = parser.parse_args()
+
+    try:
+        server = ModelServer(args.model, args.socket, args.warm_interval, args.workers)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
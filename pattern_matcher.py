@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Pattern Matcher Module - Multi-pattern substring search for intents
+Aho-Corasick automaton compiled once from all intent patterns
+
+This module:
+- Compiles every pattern into one automaton at startup
+- Finds all pattern occurrences in a single pass over the text
+- Picks the most specific match instead of the first registered one
+"""
+
+from collections import deque
+import random
+import time
+
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton mapping patterns to values (intent names)
+
+    Usage:
+        matcher = PatternMatcher()
+        matcher.add('क्या समय', 'time')
+        matcher.build()
+        matcher.best('अभी क्या समय है')  # -> 'time'
+    """
+
+    def __init__(self):
+        self.patterns = []   # (pattern, value) in registration order
+        self._goto = [{}]    # state -> {char: next state}
+        self._fail = [0]
+        self._output = [()]  # state -> ids of patterns ending here
+        self._built = True
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def add(self, pattern, value):
+        """
+        Register a pattern (call build() afterwards)
+
+        Args:
+            pattern (str): Substring to look for
+            value: Returned when the pattern matches (e.g. intent name)
+        """
+        if not pattern:
+            raise ValueError("Empty pattern")
+
+        pattern_id = len(self.patterns)
+        self.patterns.append((pattern, value))
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._output[state] = self._output[state] + (pattern_id,)
+        self._built = False
+
+    def build(self):
+        """Compute failure links (breadth-first over the trie)"""
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+
+                self._fail[next_state] = target
+                # Inherit matches of the longest proper suffix
+                self._output[next_state] = self._output[next_state] + self._output[target]
+
+        self._built = True
+
+    def find_all(self, text):
+        """
+        Find every pattern occurrence in one pass
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            list: (start, end, pattern_id) for each occurrence
+        """
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for pattern_id in output[state]:
+                length = len(patterns[pattern_id][0])
+                matches.append((index + 1 - length, index + 1, pattern_id))
+
+        return matches
+
+    def values(self, text):
+        """
+        All distinct values with at least one matching pattern
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            set: Matched values
+        """
+        return {self.patterns[pattern_id][1] for _, _, pattern_id in self.find_all(text)}
+
+    def best(self, text):
+        """
+        Value of the most specific matching pattern
+
+        Ties are broken by, in order: longest pattern, most words in the
+        pattern, earliest registration.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            The matched value, or None
+        """
+        best_key = None
+        best_value = None
+
+        for start, end, pattern_id in self.find_all(text):
+            pattern, value = self.patterns[pattern_id]
+            key = (end - start, pattern.count(' '), -pattern_id)
+            if best_key is None or key > best_key:
+                best_key = key
+                best_value = value
+
+        return best_value
+
+
+def benchmark_matcher(num_patterns=10000, num_queries=2000, seed=0):
+    """
+    Compare the automaton with the old nested loop over every pattern
+
+    Args:
+        num_patterns (int): Synthetic Devanagari patterns to register
+        num_queries (int): Utterances to match
+        seed (int): Random seed for reproducible patterns and queries
+
+    Returns:
+        dict: Build time and per-query times in microseconds
+    """
+    rng = random.Random(seed)
+    consonants = [chr(c) for c in range(0x0915, 0x0939)]
+    vowel_signs = ['', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ौ', 'ं']
+
+    def word():
+        return ''.join(rng.choice(consonants) + rng.choice(vowel_signs)
+                       for _ in range(rng.randint(2, 4)))
+
+    patterns = {}
+    while len(patterns) < num_patterns:
+        phrase = ' '.join(word() for _ in range(rng.randint(1, 2)))
+        patterns[phrase] = f"intent_{len(patterns) % (num_patterns // 10 or 1)}"
+
+    pattern_list = list(patterns.items())
+    queries = []
+    for _ in range(num_queries):
+        words = [word() for _ in range(rng.randint(2, 6))]
+        if rng.random() < 0.5:
+            words.insert(rng.randint(0, len(words)), rng.choice(pattern_list)[0])
+        queries.append(' '.join(words))
+
+    print("\n" + "="*50)
+    print(f"Pattern Matcher Benchmark ({num_patterns} patterns)")
+    print("="*50 + "\n")
+
+    start = time.perf_counter()
+    matcher = PatternMatcher()
+    for pattern, value in pattern_list:
+        matcher.add(pattern, value)
+    matcher.build()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for query in queries:
+        matcher.best(query)
+    automaton_us = (time.perf_counter() - start) / num_queries * 1e6
+
+    start = time.perf_counter()
+    for query in queries:
+        for pattern, value in pattern_list:
+            if pattern in query:
+                break
+    loop_us = (time.perf_counter() - start) / num_queries * 1e6
+
+    print(f"   Build time:     {build_ms:8.1f} ms")
+    print(f"   Automaton:      {automaton_us:8.1f} µs per utterance")
+    print(f"   Nested loop:    {loop_us:8.1f} µs per utterance")
+    print(f"   Speedup:        {loop_us / automaton_us:8.1f}x")
+    print("\n" + "="*50 + "\n")
+
+    return {
+        'build_ms': build_ms,
+        'automaton_us': automaton_us,
+        'loop_us': loop_us,
+    }
+
+
+if __name__ == "__main__":
+    # Run benchmark when this file is executed directly
+    benchmark_matcher()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Text Normalizer Module - Devanagari normalization before intent matching
+Makes spelling variants of the same Hindi word compare equal
+
+This module:
+- Applies Unicode NFC so composed and decomposed forms match
+- Folds nukta letters onto their base letter (मज़ाक -> मजाक)
+- Unifies chandrabindu, anusvara and half nasal consonants
+  (हँसो -> हंसो, हिन्दी -> हिंदी)
+- Turns punctuation (।, ?, !, commas) into spaces and collapses whitespace
+"""
+
+from functools import lru_cache
+import re
+import unicodedata
+
+NUKTA = '\u093c'
+CHANDRABINDU = '\u0901'
+ANUSVARA = '\u0902'
+
+# Zero-width joiners only change how a conjunct is drawn
+INVISIBLE = dict.fromkeys(map(ord, '\u200c\u200d\ufeff'))
+
+# Nasal consonant + virama before a stop consonant is the same as an anusvara
+# (न्य, म्ह etc. are left alone - nobody writes those with an anusvara)
+HALF_NASAL = re.compile('[ङञणनम]्(?=[क-म])')
+
+# Danda, double danda and ASCII punctuation separate tokens
+PUNCTUATION = re.compile(r'[।॥!-/:-@\[-`{-~]+')
+WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def normalize_text(text):
+    """
+    Normalize Hindi text for matching
+
+    Args:
+        text (str): Raw text (ASR output or a pattern)
+
+    Returns:
+        str: Normalized text, single spaces between tokens
+    """
+    if not text:
+        return ''
+
+    # Decompose first so precomposed nukta letters (e.g. U+095B) lose the nukta too
+    text = unicodedata.normalize('NFD', text)
+    text = text.replace(NUKTA, '').replace(CHANDRABINDU, ANUSVARA)
+    text = text.translate(INVISIBLE)
+    text = unicodedata.normalize('NFC', text)
+
+    text = HALF_NASAL.sub(ANUSVARA, text)
+    text = PUNCTUATION.sub(' ', text.lower())
+
+    return WHITESPACE.sub(' ', text).strip()
+
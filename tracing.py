@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tracing Module - Where the time of each voice command goes
+Lightweight per-turn spans on time.perf_counter_ns
+
+This module:
+- Trace: one command turn; records marks (points in time, e.g. first
+  partial, endpoint, first audio out) and accumulated durations (e.g.
+  capture, VAD, intent, synthesis)
+- Tracer: hands out traces, keeps per-stage statistics over the most
+  recent turns and optionally appends every finished trace to a JSONL file
+
+Recording is a perf_counter_ns() call and a dict update, so it can stay
+on in the audio loop.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+import json
+import statistics
+import threading
+import time
+
+# Stages in pipeline order, used for reports
+STAGES = ('capture', 'preprocess', 'vad', 'first_partial', 'endpoint',
+          'intent', 'synthesis', 'first_audio', 'playback_end')
+
+
+class Trace:
+    """
+    Timing of one command turn
+    """
+
+    __slots__ = ('turn', 'start_ns', 'marks', 'durations', 'info')
+
+    def __init__(self, turn=0):
+        self.turn = turn
+        self.start_ns = time.perf_counter_ns()
+        self.marks = {}      # name -> ns since start (first occurrence)
+        self.durations = {}  # name -> accumulated ns
+        self.info = {}       # extra fields for the trace file
+
+    def mark(self, name):
+        """Record that a point was reached (only the first time counts)"""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter_ns() - self.start_ns
+
+    def add(self, name, elapsed_ns):
+        """Add time spent in a stage (can be called many times)"""
+        self.durations[name] = self.durations.get(name, 0) + elapsed_ns
+
+    @contextmanager
+    def span(self, name):
+        """Time a block as part of a stage"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter_ns() - start)
+
+    def latency_ms(self):
+        """
+        Time from the end of the user's speech to the first audio out
+
+        Returns:
+            float: Milliseconds, or None if either point is missing
+        """
+        if 'endpoint' not in self.marks or 'first_audio' not in self.marks:
+            return None
+        return (self.marks['first_audio'] - self.marks['endpoint']) / 1e6
+
+    def to_dict(self):
+        """Trace as JSON-ready dict, times in milliseconds"""
+        record = {'turn': self.turn}
+        record.update(self.info)
+        record['marks_ms'] = {k: round(v / 1e6, 3) for k, v in self.marks.items()}
+        record['durations_ms'] = {k: round(v / 1e6, 3) for k, v in self.durations.items()}
+        latency = self.latency_ms()
+        if latency is not None:
+            record['latency_ms'] = round(latency, 3)
+        return record
+
+
+class Tracer:
+    """
+    Collects finished traces
+    """
+
+    def __init__(self, path=None, window=1000):
+        """
+        Args:
+            path (str): JSONL file every finished trace is appended to,
+                        None to keep statistics in memory only
+            window (int): Samples per stage kept for the statistics
+                          (the most recent ones), so memory stays bounded
+        """
+        self.path = path
+        self.window = window
+        self.turns = 0
+        self.samples = {}  # name -> deque of the last window ms values
+        self.counts = {}   # name -> samples seen in total
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def start(self):
+        """Begin a new turn"""
+        with self._lock:
+            self.turns += 1
+            return Trace(self.turns)
+
+    def finish(self, trace, **info):
+        """
+        Record a completed turn
+
+        Args:
+            trace (Trace): The turn
+            **info: Extra fields for the trace file (e.g. intent)
+        """
+        trace.info.update(info)
+        with self._lock:
+            for name, ns in list(trace.marks.items()) + list(trace.durations.items()):
+                self._add_sample(name, ns / 1e6)
+            latency = trace.latency_ms()
+            if latency is not None:
+                self._add_sample('latency', latency)
+
+            if self._file is not None:
+                self._file.write(json.dumps(trace.to_dict(), ensure_ascii=False) + '\n')
+                self._file.flush()
+
+    def _add_sample(self, name, value):
+        """Record one value (caller holds the lock)"""
+        values = self.samples.get(name)
+        if values is None:
+            values = self.samples[name] = deque(maxlen=self.window)
+        values.append(value)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def summary(self):
+        """
+        Per-stage statistics over the last window turns
+
+        Returns:
+            dict: name -> {'count', 'median_ms', 'p95_ms', 'max_ms'},
+                  stages in pipeline order, then 'latency'. count is
+                  the total, the times cover the recent window.
+        """
+        order = list(STAGES) + sorted(set(self.samples) - set(STAGES) - {'latency'}) + ['latency']
+        report = {}
+        with self._lock:
+            for name in order:
+                values = self.samples.get(name)
+                if not values:
+                    continue
+                ordered = sorted(values)
+                report[name] = {
+                    'count': self.counts[name],
+                    'median_ms': statistics.median(ordered),
+                    'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max_ms': ordered[-1],
+                }
+        return report
+
+    def print_summary(self):
+        """Print the per-stage table"""
+        report = self.summary()
+        if not report:
+            return
+        print("   Stage timings (median / p95 ms):")
+        for name, numbers in report.items():
+            label = 'endpoint→audio' if name == 'latency' else name
+            print(f"     {label:15s} {numbers['median_ms']:8.1f} / {numbers['p95_ms']:8.1f}")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+TTS Cache Module - Phrase-level cache of synthesized speech
+Most assistant responses are fixed strings, so they only need to be
+synthesized once
+
+This module:
+- Keys audio by content (text, voice, speed, pitch, sample rate)
+- Keeps recently used PCM in memory, bounded by a byte budget (LRU)
+- Persists PCM on disk and memory-maps it when loaded again
+"""
+
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                 'hindi-voice-assistant', 'tts')
+
+
+def cache_key(text, voice, speed, pitch, sample_rate):
+    """
+    Content address of a synthesized phrase
+
+    Returns:
+        str: Hex digest identifying the audio
+    """
+    material = f"{voice}\0{speed}\0{pitch}\0{sample_rate}\0{text}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+class PhraseCache:
+    """
+    In-memory LRU of PCM buffers backed by an optional on-disk store
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=32 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Directory for persisted PCM, None for memory only
+            max_bytes (int): Memory budget for cached audio
+            max_disk_bytes (int): Disk budget, oldest files are pruned
+                                  when the cache is opened
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._entries = OrderedDict()  # key -> bytes or mmap
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.prune_disk()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pcm')
+
+    def get(self, key):
+        """
+        Look up audio
+
+        Args:
+            key (str): See cache_key()
+
+        Returns:
+            bytes-like: PCM (bytes, or a read-only mmap when loaded from
+                        disk), or None on a miss
+        """
+        with self._lock:
+            buffer = self._entries.get(key)
+            if buffer is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return buffer
+
+        buffer = self._load(key)
+        if buffer is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, buffer)
+        return buffer
+
+    def put(self, key, pcm, persist=True):
+        """
+        Store audio
+
+        Args:
+            key (str): See cache_key()
+            pcm (bytes): 16-bit PCM
+            persist (bool): Also write it to the disk store
+        """
+        if not pcm:
+            return  # Failed synthesis - try again next time
+        if persist and self.cache_dir:
+            self._store(key, pcm)
+        self._remember(key, pcm)
+
+    def _remember(self, key, buffer):
+        """Add to the memory LRU and evict down to the budget"""
+        size = len(buffer)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+            self._entries[key] = buffer
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _load(self, key):
+        """Memory-map a persisted phrase, or None if it isn't on disk"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None  # Left by a failed synthesis
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def _store(self, key, pcm):
+        """Write a phrase atomically so readers never see partial files"""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pcm)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def contains(self, key):
+        """Check memory and disk without loading anything"""
+        if key in self._entries:
+            return True
+        if not self.cache_dir:
+            return False
+        try:
+            return os.path.getsize(self._path(key)) > 0
+        except OSError:
+            return False
+
+    def prune_disk(self):
+        """
+        Delete the least recently written files above the disk budget
+
+        Returns:
+            int: Number of files removed
+        """
+        files = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pcm'):
+                info = entry.stat()
+                files.append((info.st_mtime, info.st_size, entry.path))
+                total += info.st_size
+
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            os.unlink(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        """
+        Cache statistics
+
+        Returns:
+            dict: Entries, memory use and hit/miss counts
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
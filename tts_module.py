@@ -7,18 +7,265 @@ This module:
 - Converts Hindi text to speech
 - Plays audio through speakers
 - Manages voice settings
+
+Synthesis normally runs in-process through libespeak-ng on one
+long-lived worker thread, so each utterance skips the fork/exec and
+voice loading of a new espeak-ng process. If the library can't be
+loaded, the espeak-ng command line tool is used instead.
 """
 
+import ctypes
+import ctypes.util
+from concurrent.futures import Future, ThreadPoolExecutor
+import itertools
+import queue
+import re
+import shutil
+import statistics
 import subprocess
 import os
-import tempfile
+import threading
+import time
+import wave
+
+from audio_output import OutputEngine
+from tts_cache import DEFAULT_CACHE_DIR, PhraseCache, cache_key
+from tts_templates import ResponseTemplate, join_with_crossfade, trim_silence
+
+# libespeak-ng constants (speak_lib.h)
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+ESPEAK_INITIALIZE_DONT_EXIT = 0x8000
+ESPEAK_RATE = 1
+ESPEAK_PITCH = 3
+ESPEAK_POS_CHARACTER = 1
+ESPEAK_CHARS_UTF8 = 1
+EE_OK = 0
+
+SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short),
+                                  ctypes.c_int, ctypes.c_void_p)
+
+
+class EspeakLibrary:
+    """
+    Minimal ctypes binding for libespeak-ng in retrieval mode
+    
+    The library keeps global state, so an instance must only be used
+    from the thread that created it (see SynthesisWorker).
+    """
+    
+    def __init__(self, library_path=None):
+        """
+        Load and initialize libespeak-ng
+        
+        Args:
+            library_path (str): Path to libespeak-ng.so, found automatically
+                                when None
+        """
+        library_path = library_path or ctypes.util.find_library('espeak-ng')
+        if not library_path:
+            raise OSError("libespeak-ng not found")
+        
+        self.lib = ctypes.CDLL(library_path)
+        self.lib.espeak_Initialize.restype = ctypes.c_int
+        self.lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int,
+                                               ctypes.c_char_p, ctypes.c_int]
+        self.lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        self.lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int,
+                                                 ctypes.c_int]
+        self.lib.espeak_SetSynthCallback.argtypes = [SYNTH_CALLBACK]
+        self.lib.espeak_Synth.argtypes = [ctypes.c_void_p, ctypes.c_size_t,
+                                          ctypes.c_uint, ctypes.c_int,
+                                          ctypes.c_uint, ctypes.c_uint,
+                                          ctypes.c_void_p, ctypes.c_void_p]
+        
+        self.sample_rate = self.lib.espeak_Initialize(
+            AUDIO_OUTPUT_SYNCHRONOUS, 0, None, ESPEAK_INITIALIZE_DONT_EXIT)
+        if self.sample_rate <= 0:
+            raise OSError("espeak_Initialize failed")
+        
+        # Keep a reference so the callback isn't garbage collected
+        self._chunks = []
+        self._callback = SYNTH_CALLBACK(self._on_audio)
+        self.lib.espeak_SetSynthCallback(self._callback)
+        
+        self.settings = None
+    
+    def _on_audio(self, wav, num_samples, events):
+        """Called by the library with each block of synthesized samples"""
+        if wav and num_samples > 0:
+            self._chunks.append(ctypes.string_at(wav, num_samples * 2))
+        return 0  # continue synthesis
+    
+    def configure(self, voice, speed, pitch):
+        """Apply voice settings (only when they changed)"""
+        settings = (voice, speed, pitch)
+        if settings == self.settings:
+            return
+        
+        if self.lib.espeak_SetVoiceByName(voice.encode()) != EE_OK:
+            raise ValueError(f"Unknown eSpeak-NG voice: {voice}")
+        self.lib.espeak_SetParameter(ESPEAK_RATE, speed, 0)
+        self.lib.espeak_SetParameter(ESPEAK_PITCH, pitch, 0)
+        self.settings = settings
+    
+    def synthesize(self, text):
+        """
+        Synthesize text to 16-bit mono PCM at self.sample_rate
+        
+        Args:
+            text (str): Text to synthesize
+            
+        Returns:
+            bytes: PCM samples
+        """
+        encoded = text.encode('utf-8') + b'\0'
+        self._chunks = []
+        
+        error = self.lib.espeak_Synth(encoded, len(encoded), 0,
+                                      ESPEAK_POS_CHARACTER, 0,
+                                      ESPEAK_CHARS_UTF8, None, None)
+        if error != EE_OK:
+            raise RuntimeError(f"espeak_Synth failed with error {error}")
+        self.lib.espeak_Synchronize()
+        
+        pcm = b''.join(self._chunks)
+        self._chunks = []
+        return pcm
+
+
+class SynthesisWorker:
+    """
+    Long-lived synthesis thread that owns the libespeak-ng instance
+    
+    Requests are queued and handled one at a time, in order, except that
+    live requests go ahead of queued background (pre-render) ones.
+    """
+    
+    def __init__(self, library_path=None):
+        """
+        Start the worker and wait until the library is ready
+        
+        Raises:
+            OSError: If libespeak-ng can't be loaded or initialized
+        """
+        # (priority, sequence, request) - lowest first, FIFO within a priority
+        self.requests = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self.sample_rate = None
+        self._ready = threading.Event()
+        self._error = None
+        
+        self.thread = threading.Thread(target=self._run, args=(library_path,),
+                                       name="espeak-worker", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        
+        if self._error is not None:
+            raise self._error
+    
+    def _run(self, library_path):
+        try:
+            library = EspeakLibrary(library_path)
+            self.sample_rate = library.sample_rate
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        
+        while True:
+            _, _, request = self.requests.get()
+            if request is None:
+                break
+            
+            text, settings, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                library.configure(*settings)
+                future.set_result(library.synthesize(text))
+            except Exception as e:
+                future.set_exception(e)
+    
+    def submit(self, text, voice, speed, pitch, background=False):
+        """
+        Queue text for synthesis
+        
+        Args:
+            background (bool): Only run when no live request is waiting
+        
+        Returns:
+            Future: Resolves to the PCM bytes
+        """
+        future = Future()
+        self.requests.put((1 if background else 0, next(self._sequence),
+                           (text, (voice, speed, pitch), future)))
+        return future
+    
+    def close(self):
+        """Stop the worker thread once the queued requests are done"""
+        self.requests.put((2, next(self._sequence), None))
+        self.thread.join(timeout=2)
+
+
+# A clause ends after danda, question/exclamation mark, comma or ellipsis
+CLAUSE_BREAK = re.compile(r'(?<=[।॥?!,;…])\s+|(?<=\.\.\.)\s*')
+
+
+def split_clauses(text, min_chars=4):
+    """
+    Split text at sentence and clause boundaries for streaming synthesis
+    
+    Punctuation stays with its clause so the prosody doesn't change.
+    Very short pieces are merged into the following clause.
+    
+    Args:
+        text (str): Text to split
+        min_chars (int): Shorter clauses are merged with the next one
+        
+    Returns:
+        list: Clauses in order
+    """
+    clauses = []
+    pending = ''
+    for piece in CLAUSE_BREAK.split(text.strip()):
+        if not piece:
+            continue
+        pending = f"{pending} {piece}" if pending else piece
+        if len(pending) >= min_chars:
+            clauses.append(pending)
+            pending = ''
+    
+    if pending:
+        if clauses:
+            clauses[-1] = f"{clauses[-1]} {pending}"
+        else:
+            clauses.append(pending)
+    return clauses
+
+
+def pcm_from_wav_bytes(data):
+    """
+    Extract the samples from a WAV file in memory
+    
+    espeak-ng --stdout writes a placeholder data size, so the header
+    is skipped by hand instead of trusting the wave module.
+    """
+    index = data.find(b'data')
+    if index < 0:
+        return b''
+    pcm = data[index + 8:]
+    return pcm[:len(pcm) - len(pcm) % 2]
+
 
 class TextToSpeech:
     """
     Handles text-to-speech conversion using eSpeak-NG
     """
     
-    def __init__(self, voice='hi', speed=150, pitch=50):
+    def __init__(self, voice='hi', speed=150, pitch=50, backend='auto',
+                 cache_dir=DEFAULT_CACHE_DIR, cache_bytes=32 * 1024 * 1024,
+                 audio_output=True, streaming=True, output=None):
         """
         Initialize Text-to-Speech engine
         
@@ -26,20 +273,66 @@ class TextToSpeech:
             voice (str): Voice language code ('hi' for Hindi)
             speed (int): Speaking speed (80-500, default 150)
             pitch (int): Voice pitch (0-99, default 50)
+            backend (str): 'library' (persistent libespeak-ng worker),
+                           'subprocess' (one espeak-ng process per call)
+                           or 'auto' to prefer the library
+            cache_dir (str): Where synthesized phrases are persisted,
+                             None to keep the cache in memory only
+            cache_bytes (int): Memory budget of the phrase cache
+            audio_output (bool): Open the speaker output (False for
+                                 offline jobs such as cache building)
+            streaming (bool): Start playing the first clause of a long
+                              uncached response while the rest is synthesized
+            output (OutputEngine): Shared speaker output, e.g. one the
+                                   recognizer can interrupt (barge-in)
         """
         print("🔊 Initializing Text-to-Speech...")
         
         self.voice = voice
         self.speed = speed
         self.pitch = pitch
+        self.worker = None
+        self.player = None
+        self.sample_rate = 22050  # eSpeak-NG output rate
+        
+        if backend in ('auto', 'library'):
+            try:
+                self.worker = SynthesisWorker()
+                self.sample_rate = self.worker.sample_rate
+            except OSError as e:
+                if backend == 'library':
+                    raise
+                print(f"   ⚠️  libespeak-ng unavailable ({e}), using espeak-ng command")
+        
+        self._owns_player = output is None
+        if output is not None:
+            self.player = output
+        elif audio_output:
+            try:
+                self.player = OutputEngine(self.sample_rate)
+            except Exception as e:
+                print(f"   ⚠️  No in-process audio output ({e}), using espeak-ng command")
+        
+        # Synthesized phrases, keyed by text and voice settings
+        self.cache = PhraseCache(cache_dir, max_bytes=cache_bytes)
+        
+        # Dynamic responses spoken from cached fragments (register_template)
+        self.templates = []
+        
+        self.streaming = streaming
+        
+        self.backend = 'library' if self.worker is not None else 'subprocess'
         
         # Check if eSpeak-NG is installed
-        if not self._check_espeak():
+        if self.backend == 'subprocess' and not self._check_espeak():
             raise RuntimeError("eSpeak-NG not found. Install with: sudo apt install espeak-ng")
         
         print(f"   Voice: {voice}")
         print(f"   Speed: {speed} WPM")
         print(f"   Pitch: {pitch}")
+        print(f"   Backend: {self.backend}")
+        if cache_dir:
+            print(f"   Cache: {cache_dir}")
         print("   ✅ TTS initialized successfully!")
     
     def _check_espeak(self):
@@ -59,44 +352,296 @@ class TextToSpeech:
         except:
             return False
     
-    def speak(self, text):
+    def _command(self, text, *extra):
+        """Build an espeak-ng command line with the current settings"""
+        return [
+            'espeak-ng',
+            '-v', self.voice,       # Voice (Hindi)
+            '-s', str(self.speed),  # Speed
+            '-p', str(self.pitch),  # Pitch
+            *extra,
+            text                    # Text to speak
+        ]
+    
+    def synthesize(self, text, background=False):
+        """
+        Convert text to audio without playing it
+        
+        Args:
+            text (str): Hindi text to synthesize
+            background (bool): Let live requests on the libespeak-ng
+                               worker go first (for pre-rendering)
+            
+        Returns:
+            bytes: 16-bit mono PCM at self.sample_rate
+        """
+        if self.worker is not None:
+            future = self.worker.submit(text, self.voice, self.speed, self.pitch,
+                                        background=background)
+            return future.result(timeout=None if background else 10)
+        
+        return self._synthesize_subprocess(text)
+    
+    def _synthesize_subprocess(self, text):
+        """Synthesize with a separate espeak-ng process (thread safe)"""
+        result = subprocess.run(self._command(text, '--stdout'),
+                                capture_output=True, timeout=10)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode())
+        return pcm_from_wav_bytes(result.stdout)
+    
+    def prerender(self, phrases, workers=None, background=False, fragments=()):
+        """
+        Synthesize phrases into the cache ahead of time
+        
+        The libespeak-ng worker is single-threaded, so when the espeak-ng
+        command is installed the phrases are rendered by several espeak-ng
+        processes in parallel instead. Otherwise they go to the worker one
+        at a time as background requests, so a speak() meanwhile waits for
+        at most the phrase being rendered.
+        
+        Args:
+            phrases (list): Texts to render
+            fragments (list): Template fragments to render (see
+                              template_fragments)
+            workers (int): Parallel synthesis jobs, defaults to the CPU count
+            background (bool): Return immediately and render on a thread
+            
+        Returns:
+            dict: Phrase counts and seconds taken, or the Thread when
+                  background is True
+        """
+        if background:
+            thread = threading.Thread(target=self.prerender,
+                                      args=(phrases, workers, False, fragments),
+                                      name="tts-prerender", daemon=True)
+            thread.start()
+            return thread
+        
+        start = time.perf_counter()
+        fragment_set = set(fragments)
+        phrases = [p for p in dict.fromkeys(list(phrases) + list(fragments))
+                   if p and p.strip()]
+        
+        def key_for(text):
+            return self._cache_key(text, fragment=text in fragment_set)
+        
+        todo = [p for p in phrases if not self.cache.contains(key_for(p))]
+        
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and shutil.which('espeak-ng'):
+            synthesize = self._synthesize_subprocess
+        else:
+            workers = 1
+            
+            def synthesize(text):
+                return self.synthesize(text, background=True)
+        
+        def render(text):
+            try:
+                return synthesize(text)
+            except Exception as e:
+                print(f"⚠️  Could not pre-render '{text}': {e}")
+                return None
+        
+        rendered = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for text, pcm in zip(todo, pool.map(render, todo)):
+                if pcm is not None:
+                    if text in fragment_set:
+                        pcm = trim_silence(pcm, self.sample_rate)
+                    self.cache.put(key_for(text), pcm)
+                    rendered += 1
+        
+        return {
+            'phrases': len(phrases),
+            'already_cached': len(phrases) - len(todo),
+            'rendered': rendered,
+            'failed': len(todo) - rendered,
+            'seconds': time.perf_counter() - start,
+        }
+    
+    def _cache_key(self, text, fragment=False):
+        """Cache key of a phrase or template fragment with the current voice"""
+        if fragment:
+            # Separate namespace from whole phrases, which are not trimmed
+            text = '\x01fragment\x01' + text
+        return cache_key(text, self.voice, self.speed, self.pitch, self.sample_rate)
+    
+    def get_audio(self, text, persist=True):
+        """
+        Get the audio for a phrase, synthesizing it only on a cache miss
+        
+        Args:
+            text (str): Hindi text
+            persist (bool): Write newly synthesized audio to the disk cache
+            
+        Returns:
+            bytes-like: 16-bit mono PCM at self.sample_rate
+        """
+        key = self._cache_key(text)
+        pcm = self.cache.get(key)
+        if pcm is None:
+            pcm = self.synthesize(text)
+            self.cache.put(key, pcm, persist=persist)
+        return pcm
+    
+    def register_template(self, template, slot_values=None):
+        """
+        Speak responses that fit a template by joining cached fragments
+        
+        Args:
+            template (str): str.format style template, e.g.
+                            'अभी {hour} बजकर {minute} मिनट {period} के हैं'
+            slot_values (dict): Known values per slot, for pre-rendering
+        """
+        self.templates.append(ResponseTemplate(template, slot_values))
+    
+    def template_fragments(self):
+        """
+        All fragments of the registered templates (for pre-rendering)
+        
+        Returns:
+            list: Unique fragment texts
+        """
+        fragments = []
+        for template in self.templates:
+            fragments.extend(template.fragments())
+        return list(dict.fromkeys(fragments))
+    
+    def get_fragment(self, text):
+        """
+        Get the silence-trimmed audio of one template fragment
+        
+        Args:
+            text (str): Fragment text (a word or number)
+            
+        Returns:
+            bytes-like: 16-bit mono PCM
+        """
+        key = self._cache_key(text, fragment=True)
+        pcm = self.cache.get(key)
+        if pcm is None:
+            pcm = trim_silence(self.synthesize(text), self.sample_rate)
+            self.cache.put(key, pcm)
+        return pcm
+    
+    def render_template(self, text):
+        """
+        Build the audio of a templated response from its fragments
+        
+        Args:
+            text (str): Response text
+            
+        Returns:
+            bytes: 16-bit mono PCM, or None if no template fits the text
+        """
+        for template in self.templates:
+            fragments = template.split(text)
+            if fragments:
+                audio = [self.get_fragment(fragment) for fragment in fragments]
+                return join_with_crossfade(audio, self.sample_rate)
+        return None
+    
+    def _speak_streaming(self, clauses, trace=None):
+        """
+        Play clauses while the following ones are still being synthesized
+        
+        Args:
+            clauses (list): Text pieces from split_clauses()
+            trace (Trace): Records synthesis time and first audio out
+            
+        Returns:
+            bool: False if playback was stopped (barge-in)
+        """
+        audio_queue = queue.Queue()
+        
+        def produce():
+            try:
+                for clause in clauses:
+                    start = time.perf_counter_ns()
+                    pcm = self.get_audio(clause)
+                    if trace is not None:
+                        trace.add('synthesis', time.perf_counter_ns() - start)
+                    audio_queue.put(pcm)
+            except Exception as e:
+                audio_queue.put(e)
+                return
+            audio_queue.put(None)
+        
+        threading.Thread(target=produce, name="tts-stream", daemon=True).start()
+        
+        while True:
+            item = audio_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if trace is not None:
+                trace.mark('first_audio')
+            if not self.player.play(item):
+                return False
+        return True
+    
+    def speak(self, text, trace=None):
         """
         Convert text to speech and play it
         
+        Cached phrases are played straight from the cache buffer, and
+        templated responses (time, date) are joined from cached fragments.
+        Long uncached responses are streamed clause by clause, so the time
+        to first audio only depends on the first clause.
+        
         Args:
             text (str): Hindi text to speak
+            trace (Trace): Records synthesis time and first audio out
+            
+        Returns:
+            bool: False if the speech was interrupted (barge-in) or failed
         """
         
         if not text or text.strip() == '':
             print("⚠️  No text to speak")
-            return
+            return True
         
         print(f"🔊 Speaking: {text}")
         
         try:
-            # Build eSpeak-NG command
-            command = [
-                'espeak-ng',
-                '-v', self.voice,      # Voice (Hindi)
-                '-s', str(self.speed),  # Speed
-                '-p', str(self.pitch),  # Pitch
-                text                    # Text to speak
-            ]
+            if self.player is not None:
+                start = time.perf_counter_ns()
+                pcm = self.render_template(text)
+                
+                if pcm is None and self.streaming and not self.cache.contains(self._cache_key(text)):
+                    clauses = split_clauses(text)
+                    if len(clauses) > 1:
+                        return self._speak_streaming(clauses, trace)
+                
+                if pcm is None:
+                    pcm = self.get_audio(text)
+                
+                if trace is not None:
+                    trace.add('synthesis', time.perf_counter_ns() - start)
+                    trace.mark('first_audio')
+                return self.player.play(pcm)
             
             # Execute and wait for completion
+            if trace is not None:
+                trace.mark('first_audio')  # espeak-ng synthesizes and plays
             result = subprocess.run(
-                command,
+                self._command(text),
                 capture_output=True,
                 timeout=10
             )
             
             if result.returncode != 0:
                 print(f"⚠️  eSpeak-NG error: {result.stderr.decode()}")
+            return result.returncode == 0
         
         except subprocess.TimeoutExpired:
             print("⚠️  Speech timeout - text too long?")
         except Exception as e:
             print(f"❌ Error speaking: {e}")
+        return False
     
     def speak_to_file(self, text, filename):
         """
@@ -110,17 +655,18 @@ class TextToSpeech:
         print(f"💾 Saving speech to: {filename}")
         
         try:
-            command = [
-                'espeak-ng',
-                '-v', self.voice,
-                '-s', str(self.speed),
-                '-p', str(self.pitch),
-                '-w', filename,  # Write to file
-                text
-            ]
+            if self.worker is not None:
+                pcm = self.get_audio(text)
+                with wave.open(filename, 'wb') as wav:
+                    wav.setnchannels(1)
+                    wav.setsampwidth(2)
+                    wav.setframerate(self.sample_rate)
+                    wav.writeframes(pcm)
+                print(f"   ✅ Saved successfully!")
+                return
             
             result = subprocess.run(
-                command,
+                self._command(text, '-w', filename),  # Write to file
                 capture_output=True,
                 timeout=10
             )
@@ -194,6 +740,13 @@ class TextToSpeech:
             time.sleep(0.5)
         
         print("\n✅ Voice test complete!")
+    
+    def close(self):
+        """Stop the synthesis worker and release the audio output"""
+        if self.worker is not None:
+            self.worker.close()
+        if self.player is not None and self._owns_player:
+            self.player.close()
 
 
 def test_tts():
@@ -257,13 +810,76 @@ def test_tts():
     if os.path.exists(output_file):
         print(f"✅ File created: {output_file}")
         print("   Playing saved file...")
-        subprocess.run(['aplay', output_file])
+        if tts.player is not None:
+            with open(output_file, 'rb') as f:
+                tts.player.play(pcm_from_wav_bytes(f.read()))
+    
+    tts.close()
     
     print("\n" + "="*50)
     print("Test Complete!")
     print("="*50 + "\n")
 
 
+def benchmark_tts(rounds=10):
+    """
+    Compare synthesis latency of one espeak-ng process per utterance
+    with the persistent libespeak-ng worker
+    
+    Both synthesize to a buffer (no playback), so only synthesis time
+    is measured.
+    
+    Args:
+        rounds (int): Utterances per backend
+        
+    Returns:
+        dict: Median and mean latency (ms) per backend
+    """
+    
+    print("\n" + "="*50)
+    print("TTS Latency Benchmark")
+    print("="*50 + "\n")
+    
+    phrases = [
+        'आपका स्वागत है!',
+        'अभी 3 बजकर 25 मिनट शाम के हैं',
+        'मैं एक हिंदी आवाज़ सहायक हूं।',
+    ]
+    
+    results = {}
+    for backend in ('subprocess', 'library'):
+        try:
+            tts = TextToSpeech(backend=backend, cache_dir=None)
+        except (OSError, RuntimeError) as e:
+            print(f"   {backend:10s} unavailable: {e}")
+            continue
+        
+        timings = []
+        for i in range(rounds):
+            start = time.perf_counter()
+            tts.synthesize(phrases[i % len(phrases)])
+            timings.append((time.perf_counter() - start) * 1000)
+        tts.close()
+        
+        results[backend] = {
+            'median_ms': statistics.median(timings),
+            'mean_ms': statistics.mean(timings),
+        }
+    
+    print()
+    for backend, numbers in results.items():
+        print(f"   {backend:10s} median {numbers['median_ms']:7.1f} ms   "
+              f"mean {numbers['mean_ms']:7.1f} ms")
+    
+    print("\n" + "="*50 + "\n")
+    return results
+
+
 if __name__ == "__main__":
     # Run test when this file is executed directly
-    test_tts()
+    import sys
+    
+    if '--benchmark' in sys.argv:
+        benchmark_tts()
+    else:
+        test_tts()
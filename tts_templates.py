@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+TTS Templates Module - Dynamic responses from cached speech fragments
+Time and date answers change every minute, so they are spoken by
+joining pre-synthesized pieces instead of synthesizing the whole string
+
+This module:
+- Parses response templates like 'अभी {hour} बजकर {minute} मिनट ...'
+- Splits a concrete response into fixed-word and slot-value fragments
+- Trims fragment silence and joins the PCM with short crossfades
+"""
+
+import re
+import string
+
+import numpy as np
+
+
+class ResponseTemplate:
+    """
+    A response format string whose pieces are spoken as separate fragments
+    """
+
+    def __init__(self, template, slot_values=None):
+        """
+        Args:
+            template (str): str.format style template
+            slot_values (dict): Known values per slot name, used to list
+                                the fragments worth pre-rendering
+        """
+        self.template = template
+        self.slot_values = slot_values or {}
+        self.parts = []  # ('text', literal) or ('slot', name)
+
+        pattern = ''
+        for literal, field, _, _ in string.Formatter().parse(template):
+            if literal:
+                self.parts.append(('text', literal))
+                pattern += re.escape(literal)
+            if field is not None:
+                self.parts.append(('slot', field))
+                pattern += f'(?P<{field}>.+?)'
+
+        self.regex = re.compile(pattern + '$')
+
+    @staticmethod
+    def _fragment(text):
+        """Fragment text of a literal piece, or None if it is just spacing"""
+        text = text.strip()
+        return text if text.strip(' ,') else None
+
+    def split(self, text):
+        """
+        Split a concrete response into fragments
+
+        Args:
+            text (str): A response produced from this template
+
+        Returns:
+            list: Fragment texts, or None if the text doesn't fit the template
+        """
+        match = self.regex.match(text)
+        if match is None:
+            return None
+
+        fragments = []
+        for kind, value in self.parts:
+            fragment = self._fragment(value if kind == 'text' else match.group(value))
+            if fragment:
+                fragments.append(fragment)
+        return fragments
+
+    def fragments(self):
+        """
+        Every fragment this template can need, for pre-rendering
+
+        Returns:
+            list: Literal pieces plus all known slot values
+        """
+        fragments = []
+        for kind, value in self.parts:
+            if kind == 'text':
+                fragment = self._fragment(value)
+                if fragment:
+                    fragments.append(fragment)
+            else:
+                fragments.extend(str(v) for v in self.slot_values.get(value, []))
+        return fragments
+
+
+def trim_silence(pcm, sample_rate, threshold=300, margin_ms=10):
+    """
+    Remove leading and trailing silence from 16-bit PCM
+
+    Args:
+        pcm (bytes): Audio to trim
+        sample_rate (int): Sample rate of the audio
+        threshold (int): Sample magnitude that counts as sound
+        margin_ms (int): Silence kept on each side
+
+    Returns:
+        bytes: Trimmed audio
+    """
+    samples = np.frombuffer(pcm, dtype='<i2')
+    loud = np.flatnonzero(np.abs(samples) > threshold)
+    if loud.size == 0:
+        return b''
+
+    margin = int(sample_rate * margin_ms / 1000)
+    start = max(0, loud[0] - margin)
+    end = min(samples.size, loud[-1] + margin + 1)
+    return samples[start:end].tobytes()
+
+
+def join_with_crossfade(buffers, sample_rate, fade_ms=8):
+    """
+    Concatenate PCM buffers with a short linear crossfade at each joint
+
+    Args:
+        buffers (list): 16-bit PCM buffers in order
+        sample_rate (int): Sample rate of the audio
+        fade_ms (int): Crossfade length
+
+    Returns:
+        bytes: Joined audio
+    """
+    parts = [np.frombuffer(b, dtype='<i2').astype(np.float32)
+             for b in buffers if len(b)]
+    if not parts:
+        return b''
+
+    fade = int(sample_rate * fade_ms / 1000)
+    ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+
+    pieces = []
+    tail = parts[0]
+    for part in parts[1:]:
+        n = min(fade, tail.size, part.size)
+        if n == 0:
+            pieces.append(tail)
+            tail = part
+            continue
+
+        up = ramp[:n] if n == fade else np.linspace(0.0, 1.0, n, dtype=np.float32)
+        pieces.append(tail[:-n])
+        pieces.append(tail[-n:] * (1.0 - up) + part[:n] * up)
+        tail = part[n:]
+    pieces.append(tail)
+
+    joined = np.concatenate(pieces)
+    return np.clip(joined, -32768, 32767).astype('<i2').tobytes()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+TTS Warm-up - Pre-render every fixed assistant response
+Fills the phrase cache so no canned answer waits for synthesis
+
+This module:
+- Collects the static responses of IntentHandler and the welcome line,
+  plus the fragments of the time/date response templates
+- Synthesizes them in parallel into the TTS cache
+- Can run at startup (in the background) or ahead of time, e.g. while
+  building the SD card image
+
+Usage:
+    python3 tts_warmup.py
+    python3 tts_warmup.py --cache-dir /opt/assistant/tts-cache --workers 4
+"""
+
+import argparse
+import sys
+
+from intent_handler import IntentHandler
+from tts_cache import DEFAULT_CACHE_DIR
+
+
+def collect_phrases(intent_handler):
+    """
+    All fixed texts the assistant can say
+
+    Args:
+        intent_handler (IntentHandler): Source of the action responses
+
+    Returns:
+        list: Unique phrases
+    """
+    return intent_handler.get_static_responses()
+
+
+def register_templates(tts, intent_handler):
+    """Let the TTS speak the handler's dynamic responses from fragments"""
+    for template, slot_values in intent_handler.get_response_templates():
+        tts.register_template(template, slot_values)
+
+
+def warm_up(tts, intent_handler, workers=None, background=True):
+    """
+    Pre-render all fixed responses and template fragments into the TTS cache
+
+    Args:
+        tts (TextToSpeech): Engine whose cache is filled
+        intent_handler (IntentHandler): Source of the action responses
+        workers (int): Parallel synthesis jobs
+        background (bool): Render on a background thread
+
+    Returns:
+        dict or Thread: Report from TextToSpeech.prerender, or the thread
+    """
+    if not tts.templates:
+        register_templates(tts, intent_handler)
+
+    return tts.prerender(collect_phrases(intent_handler), workers=workers,
+                         background=background,
+                         fragments=tts.template_fragments())
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Pre-render the assistant's fixed responses into the TTS cache")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="parallel synthesis jobs (default: CPU count)")
+    parser.add_argument('--voice', default='hi')
+    parser.add_argument('--speed', type=int, default=150)
+    parser.add_argument('--pitch', type=int, default=50)
+    args = parser.parse_args()
+
+    from tts_module import TextToSpeech
+
+    tts = TextToSpeech(voice=args.voice, speed=args.speed, pitch=args.pitch,
+                       cache_dir=args.cache_dir, audio_output=False)
+    handler = IntentHandler()
+
+    print("\n🔥 Pre-rendering responses...")
+    report = warm_up(tts, handler, workers=args.workers, background=False)
+    tts.close()
+
+    print("=" * 50)
+    print(f"   Phrases: {report['phrases']}")
+    print(f"   Already cached: {report['already_cached']}")
+    print(f"   Rendered: {report['rendered']}")
+    print(f"   Failed: {report['failed']}")
+    print(f"   Time: {report['seconds']:.2f} seconds")
+    print("=" * 50)
+
+    return 1 if report['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())